@@ -0,0 +1,69 @@
+"""Compare the memory held by a large list of findings.
+
+    python benchmarks/bench_memory.py [N]
+
+"legacy" is the pre-__slots__ Finding that stored its own file path and
+message on every instance, built here the way it used to be: from strings
+that arrive as fresh copies (unpickled worker results, decoded cache
+entries).
+"""
+import sys
+import tracemalloc
+
+from greenlint.rules import ALL_RULES, Finding
+
+
+class LegacyFinding:
+    def __init__(self, file, lineno, rule_id, message, severity="MEDIUM"):
+        self.file = file
+        self.lineno = lineno
+        self.rule_id = rule_id
+        self.message = message
+        self.severity = severity
+
+
+def _rows(n, per_file=20):
+    rules = [r for r in ALL_RULES if r.node_types]
+    for i in range(n):
+        rule = rules[i % len(rules)]
+        yield f"src/pkg{i // 1000}/module_{i // per_file}.py", i % 400 + 1, rule.id, rule.message
+
+
+def build_legacy(n):
+    # "".join makes a distinct copy, as unpickling or json decoding would.
+    return [LegacyFinding("".join(f), line, "".join(rid), "".join(msg))
+            for f, line, rid, msg in _rows(n)]
+
+
+def build_compact(n):
+    out = []
+    last_file = None
+    for f, line, rid, msg in _rows(n):
+        if f != last_file:
+            last_file = "".join(f)
+        out.append(Finding(last_file, line, sys.intern("".join(rid)), None))
+    return out
+
+
+def measure(build, n):
+    tracemalloc.start()
+    findings = build(n)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del findings
+    return current
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 1_000_000
+    legacy = measure(build_legacy, n)
+    compact = measure(build_compact, n)
+    print(f"{n:,} findings")
+    print(f"  legacy  : {legacy / 2**20:8.1f} MiB  ({legacy / n:.0f} B/finding)")
+    print(f"  compact : {compact / 2**20:8.1f} MiB  ({compact / n:.0f} B/finding)")
+    print(f"  reduction: {100 * (1 - compact / legacy):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""CLI startup time as the number of installed rule packs grows.
+
+    python -m benchmarks.bench_startup [--packs 0 10 50] [--repeat 7] [--output results.json]
+    python -m benchmarks.bench_startup --baseline results.json --threshold 0.2
+
+For each pack count, generates that many fake rule packs (a module plus a
+dist-info with a "greenlint.rules" entry point, three rules each) on a
+PYTHONPATH of their own and times fresh interpreters running:
+
+* `greenlint --version`
+* a single-file scan with only the built-in rules selected (--select PY,AI,PD,IO)
+* a single-file scan with every rule, which has to import every pack
+
+The first two should stay flat: listing rules reads entry point names only,
+and packs are imported when one of their rules is selected. Results use the
+metric format of benchmarks.run, so --baseline gates regressions the same way.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import _metric, compare
+
+PACK = '''\
+import ast
+from greenlint.rules import RuleBase
+
+{classes}'''
+RULE = '''
+class Rule{n}(RuleBase):
+    id = "{rule_id}"
+    message = "Synthetic rule {rule_id}."
+    node_types = (ast.Call,)
+    triggers = (b"pack{pack}_{n}",)
+
+    def visit(self, node, ctx):
+        if getattr(node.func, "id", None) == "pack{pack}_{n}":
+            self.report(ctx, node)
+'''
+RULES_PER_PACK = 3
+SAMPLE = "import requests\nfor u in urls:\n    if u in list(seen):\n        requests.get(u)\n"
+
+
+def make_packs(directory, count):
+    for pack in range(count):
+        classes = "".join(RULE.format(n=n, pack=pack, rule_id=f"ZZ{pack:03d}{n}") for n in range(RULES_PER_PACK))
+        with open(os.path.join(directory, f"bench_pack{pack}.py"), "w", encoding="utf-8") as fp:
+            fp.write(PACK.format(classes=classes))
+        info = os.path.join(directory, f"bench_pack{pack}-1.0.dist-info")
+        os.makedirs(info)
+        with open(os.path.join(info, "entry_points.txt"), "w", encoding="utf-8") as fp:
+            fp.write("[greenlint.rules]\n")
+            for n in range(RULES_PER_PACK):
+                fp.write(f"ZZ{pack:03d}{n} = bench_pack{pack}:Rule{n}\n")
+
+
+def best_of(cmd, env, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(args):
+    metrics = {}
+    cli = [sys.executable, "-m", "greenlint.cli"]
+    for count in args.packs:
+        with tempfile.TemporaryDirectory(prefix="greenlint-startup-") as tmp:
+            site = os.path.join(tmp, "site")
+            os.makedirs(site)
+            make_packs(site, count)
+            sample = os.path.join(tmp, "sample.py")
+            with open(sample, "w", encoding="utf-8") as fp:
+                fp.write(SAMPLE)
+            env = dict(os.environ)
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [site, os.getcwd(), env.get("PYTHONPATH")]))
+            scan = [*cli, sample, "--no-cache", "-j", "1"]
+            metrics[f"packs{count}.version.seconds"] = _metric(
+                best_of([*cli, "--version"], env, args.repeat), "s", "lower")
+            metrics[f"packs{count}.scan_builtin.seconds"] = _metric(
+                best_of([*scan, "--select", "PY,AI,PD,IO"], env, args.repeat), "s", "lower")
+            metrics[f"packs{count}.scan_all.seconds"] = _metric(best_of(scan, env, args.repeat), "s", "lower")
+    return {"python": sys.version.split()[0], "params": {"packs": args.packs, "rules_per_pack": RULES_PER_PACK},
+            "metrics": metrics}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark greenlint startup with many rule packs")
+    parser.add_argument("--packs", type=int, nargs="+", default=[0, 10, 50])
+    parser.add_argument("--repeat", type=int, default=7, help="Take the best of N runs")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative regression before failing (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    for name, m in results["metrics"].items():
+        print(f"{name:<36}{m['value'] * 1000:>10.1f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.3f}s -> {new:.3f}s ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Scanner throughput benchmarks with regression gating.
+
+    python -m benchmarks.run --files 5000 --output results.json
+    python -m benchmarks.run --files 5000 --baseline results.json --threshold 0.2
+
+Generates a synthetic tree (see benchmarks.synth), then measures:
+
+* scan_path throughput in-process, serial and with all cores
+* per-rule cost from the --profile instrumentation
+* the CLI end to end, cold and warm cache, including peak RSS of the process
+* the CLI with --index, which parses most files to build the call graph
+* report writing throughput for every output format
+
+Results are written as JSON. With --baseline, each gated metric is compared
+to the baseline run and the process exits 1 if any got worse by more than
+--threshold (relative). Everything runs offline; RSS comes from wait4().
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synth import generate
+from greenlint import __version__
+from greenlint.perf import Profiler
+from greenlint.rules import ALL_RULES, Finding
+from greenlint.scanner import scan_path
+from greenlint.writers import WRITERS
+
+
+def _metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_scan(root, jobs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        findings = scan_path(root, jobs=jobs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(findings)
+
+
+def bench_rules(root):
+    profiler = Profiler()
+    scan_path(root, jobs=1, profiler=profiler)
+    stats = profiler.finish()
+    return stats["rules"], stats["phases"]
+
+
+def bench_cli(root, args):
+    # Run the CLI as a child and read its own peak RSS from wait4().
+    cmd = [sys.executable, "-m", "greenlint.cli", root, *args]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _pid, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(cmd)} failed: {proc.stderr.read().decode()}")
+    proc.stderr.close()
+    # ru_maxrss is in KiB on Linux.
+    return elapsed, usage.ru_maxrss / 1024
+
+
+def bench_writers(n):
+    rules = [r for r in ALL_RULES if r.node_types]
+    findings = [Finding(f"pkg/mod{i // 20}.py", i % 400 + 1, rules[i % len(rules)].id) for i in range(n)]
+    summary = {"total_findings": n}
+    results = {}
+    for name, cls in WRITERS.items():
+        out = io.StringIO()
+        start = time.perf_counter()
+        writer = cls(out)
+        for f in findings:
+            writer.write(f.to_dict())
+        writer.close(summary)
+        results[name] = (n / (time.perf_counter() - start), out.tell())
+    return results
+
+
+def run(args):
+    metrics = {}
+    with tempfile.TemporaryDirectory(prefix="greenlint-bench-") as tmp:
+        root = os.path.join(tmp, "tree")
+        start = time.perf_counter()
+        manifest = generate(root, args.files, args.depth, filler=args.filler, artifact_mb=args.artifact_mb)
+        print(f"generated {args.files} files ({manifest['lines']} lines) in {time.perf_counter() - start:.1f}s",
+              file=sys.stderr)
+        files = args.files + len(args.artifact_mb)
+
+        elapsed, found = bench_scan(root, 1, args.repeat)
+        expected = sum(manifest["expected"].values())
+        if found != expected:
+            raise RuntimeError(f"scan found {found} findings, generator expected {expected}")
+        metrics["scan.serial.files_per_sec"] = _metric(files / elapsed, "files/s", "higher")
+
+        jobs = args.jobs or os.cpu_count() or 1
+        elapsed, _ = bench_scan(root, jobs, args.repeat)
+        metrics["scan.parallel.files_per_sec"] = _metric(files / elapsed, "files/s", "higher")
+
+        rules, phases = bench_rules(root)
+
+        cache_dir = os.path.join(tmp, "cache")
+        report = os.path.join(tmp, "report.json")
+        common = ["-j", str(jobs), "--cache-dir", cache_dir, "-o", report]
+        elapsed, rss = bench_cli(root, common)
+        metrics["cli.cold.seconds"] = _metric(elapsed, "s", "lower")
+        metrics["cli.cold.peak_rss_mb"] = _metric(rss, "MiB", "lower")
+        elapsed, rss = bench_cli(root, common)
+        metrics["cli.warm.seconds"] = _metric(elapsed, "s", "lower")
+        metrics["cli.warm.peak_rss_mb"] = _metric(rss, "MiB", "lower")
+        elapsed, rss = bench_cli(root, ["-j", "1", "--no-cache", "-o", report])
+        metrics["cli.serial.seconds"] = _metric(elapsed, "s", "lower")
+        metrics["cli.serial.peak_rss_mb"] = _metric(rss, "MiB", "lower")
+        elapsed, rss = bench_cli(root, ["-j", "1", "--no-cache", "--index", "-o", report])
+        metrics["cli.serial_index.seconds"] = _metric(elapsed, "s", "lower")
+        metrics["cli.serial_index.peak_rss_mb"] = _metric(rss, "MiB", "lower")
+
+    for name, (rate, size) in bench_writers(args.write_findings).items():
+        metrics[f"write.{name}.findings_per_sec"] = _metric(rate, "findings/s", "higher")
+        metrics[f"write.{name}.bytes_per_finding"] = _metric(size / args.write_findings, "B", "lower")
+
+    return {
+        "greenlint": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "params": {"files": args.files, "depth": args.depth, "filler": args.filler,
+                   "artifact_mb": args.artifact_mb, "jobs": jobs},
+        "metrics": metrics,
+        # Informational only: per-rule costs are too small to gate on reliably.
+        "rules": rules,
+        "phases": phases,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (name, baseline, current, change) for regressed metrics."""
+    regressions = []
+    for name, old in baseline.get("metrics", {}).items():
+        new = results["metrics"].get(name)
+        if new is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = -change if old["better"] == "higher" else change
+        if worse > threshold:
+            regressions.append((name, old["value"], new["value"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark greenlint on a synthetic tree")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--filler", type=int, default=5)
+    parser.add_argument("--artifact-mb", type=float, action="append", default=[])
+    parser.add_argument("--jobs", type=int, help="Workers for parallel runs (default: all CPUs)")
+    parser.add_argument("--repeat", type=int, default=3, help="Take the best of N in-process scans")
+    parser.add_argument("--write-findings", type=int, default=200_000)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative regression before failing (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    for name, m in results["metrics"].items():
+        print(f"{name:<36}{m['value']:>14.2f} {m['unit']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.2f} -> {new:.2f} ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
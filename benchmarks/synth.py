@@ -0,0 +1,118 @@
+"""Synthetic repository generator for scanner benchmarks.
+
+    python -m benchmarks.synth OUT_DIR --files 5000 --depth 4 --density PY001=2 --artifact-mb 600
+
+Every generated pattern triggers exactly one rule once, so `expected`
+in the returned manifest is the exact finding count per rule.
+"""
+import argparse
+import json
+import os
+
+# Loop-body snippets; `{var}` is the innermost loop variable.
+PATTERNS = {
+    "PY001": "if {var} in items:\n    hits += 1\n",
+    "PY002": "requests.get(urls[{var}])\n",
+    "PY003": None,
+    "AI002": None,
+    "PD001": "df.apply(lambda r: r[\"a\"] + r[\"b\"], axis=1)\n",
+    "IO001": "open(paths[{var}])\n",
+}
+DEFAULT_DENSITY = {"PY001": 1.0, "PY002": 0.5, "PY003": 1.0, "AI002": 0.2, "PD001": 0.3, "IO001": 0.5}
+
+HEADER = "import logging\nimport requests\n\nitems = list(range(100))\nurls = paths = [str(i) for i in items]\n\n"
+FILLER = '''
+def helper_{n}(values):
+    total = 0
+    while total < 10:
+        total += 1
+    return [v * 2 for v in values if v % 3] + [total]
+
+'''
+
+
+def _count(index, density):
+    # Spread a fractional per-file density evenly and deterministically.
+    return int((index + 1) * density) - int(index * density)
+
+
+def _loop(n, rule, depth):
+    lines = [f"def {rule.lower()}_case_{n}(df, model):\n", "    hits = 0\n"]
+    ind = "    "
+    for d in range(depth):
+        lines.append(f"{ind}for i{d} in range({10 + d}):\n")
+        ind += "    "
+    body = PATTERNS[rule].format(var=f"i{depth - 1}")
+    lines.extend(ind + line for line in body.splitlines(keepends=True))
+    lines.append("    return hits\n\n")
+    return "".join(lines)
+
+
+def _snippet(n, rule, depth):
+    if rule == "PY003":
+        return f"def log_case_{n}(x):\n    logging.debug(f\"value is {{x}}\")\n\n"
+    if rule == "AI002":
+        return f"def train_case_{n}(model, X, y):\n    return model.fit(X, y)\n\n"
+    if rule == "PD001":
+        return f"def frame_case_{n}(df):\n    return {PATTERNS['PD001']}\n"
+    return _loop(n, rule, depth)
+
+
+def generate(root, files=1000, depth=3, density=None, filler=5, per_package=100, artifact_mb=()):
+    """Write a synthetic tree under root and return a manifest dict."""
+    density = dict(DEFAULT_DENSITY, **(density or {}))
+    expected = dict.fromkeys(density, 0)
+    lines = 0
+    for i in range(files):
+        package = os.path.join(root, f"pkg{i // per_package:04d}")
+        os.makedirs(package, exist_ok=True)
+        # The leading comment keeps every file's content (and cache key) distinct.
+        parts = [f"# synthetic module {i}\n", HEADER]
+        n = 0
+        for rule, d in density.items():
+            for _ in range(_count(i, d)):
+                parts.append(_snippet(n, rule, depth))
+                expected[rule] += 1
+                n += 1
+        parts.extend(FILLER.format(n=k) for k in range(filler))
+        text = "".join(parts)
+        lines += text.count("\n")
+        with open(os.path.join(package, f"mod{i:05d}.py"), "w", encoding="utf-8") as fp:
+            fp.write(text)
+
+    models = os.path.join(root, "models")
+    for k, size_mb in enumerate(artifact_mb):
+        os.makedirs(models, exist_ok=True)
+        # Sparse file: the size is real to stat() but no blocks are written.
+        with open(os.path.join(models, f"model{k}.onnx"), "wb") as fp:
+            fp.truncate(int(size_mb * 1024 * 1024))
+        if size_mb > 500:
+            expected["AI001"] = expected.get("AI001", 0) + 1
+
+    return {"files": files, "depth": depth, "lines": lines, "density": density,
+            "artifacts": list(artifact_mb), "expected": expected}
+
+
+def _density(value):
+    rule, _, d = value.partition("=")
+    return rule, float(d)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic tree for benchmarking greenlint")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3, help="Loop nesting depth of loop patterns")
+    parser.add_argument("--density", type=_density, action="append", default=[], metavar="RULE=N",
+                        help="Average occurrences of RULE's pattern per file")
+    parser.add_argument("--filler", type=int, default=5, help="Clean helper functions per file")
+    parser.add_argument("--artifact-mb", type=float, action="append", default=[],
+                        help="Add a sparse model artifact of this size (repeatable)")
+    args = parser.parse_args(argv)
+    manifest = generate(args.root, args.files, args.depth, dict(args.density), args.filler,
+                        artifact_mb=args.artifact_mb)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,60 @@
-import json, os, io, pathlib
+import os, pathlib, hashlib
 import pandas as pd
 import streamlit as st
 
 st.set_page_config(page_title="GreenLint Dashboard", layout="wide")
 st.title("🌿 GreenLint Report Viewer")
 
-st.caption("Upload one or more GreenLint JSON reports (Python or Java). "
+st.caption("Upload one or more GreenLint reports (Python or Java): JSON, or Arrow/Parquet from "
+           "`greenlint --format arrow|parquet`. "
            "Schema expected: findings = [{file, line, rule, message, severity}] + summary.")
 
 # --- Upload one or more reports ---
-uploads = st.file_uploader("Upload greenlint_report.json file(s)", type="json", accept_multiple_files=True)
+uploads = st.file_uploader("Upload greenlint report file(s)", type=["json", "arrow", "parquet"],
+                           accept_multiple_files=True)
+
+CATEGORIES = ["report", "file", "rule", "severity"]
+PAGE_SIZES = [50, 100, 500, 1000]
 
-all_rows = []
-summaries = []
 df = pd.DataFrame()  # Ensure df is always defined
+filtered = pd.DataFrame()
 
-def load_report(fp, name_hint):
-    data = json.load(fp)
-    # tolerate slightly different schemas
-    findings = data.get("findings", data.get("results", []))
-    summary = data.get("summary", {})
-    for f in findings:
-        all_rows.append({
-            "report": name_hint,
-            "file": f.get("file", ""),
-            "line": f.get("line", 0),
-            "rule": f.get("rule") or f.get("rule_id", "UNKNOWN"),
-            "message": f.get("message", ""),
-            "severity": f.get("severity", "MEDIUM"),
-        })
-    if summary:
-        summaries.append({
-            "report": name_hint,
-            "total_findings": summary.get("total_findings", len(findings)),
-            "score": summary.get("score", None)
-        })
-    else:
-        summaries.append({
-            "report": name_hint,
-            "total_findings": len(findings),
-            "score": None
-        })
+@st.cache_resource(show_spinner="Loading report…", max_entries=16)
+def load_report(digest, _data, name_hint):
+    """(findings frame, summary row) for one uploaded report (see greenlint.report.load_frame).
+
+    Cached by the content digest; `_data` is excluded from hashing. The frame
+    is shared across reruns and sessions without copying, so treat it as
+    read-only.
+    """
+    from greenlint.report import load_frame
+    frame, row = load_frame(_data, name_hint)
+    return frame.astype({col: "category" for col in CATEGORIES}), row
+
+def filter_findings(df, rule_sel, sev_sel, file_sel):
+    mask = pd.Series(True, index=df.index)
+    if rule_sel: mask &= df["rule"].isin(rule_sel)
+    if sev_sel: mask &= df["severity"].isin(sev_sel)
+    if file_sel:
+        # Match each distinct path once, not once per finding.
+        files = df["file"].cat.categories
+        mask &= df["file"].isin(files[files.str.contains(file_sel, case=False, regex=False)])
+    return df[mask]
 
-    
 
 if uploads:
+    frames, summaries = [], []
     for upl in uploads:
-        load_report(upl, upl.name)
+        data = upl.getvalue()
+        frame, row = load_report(hashlib.blake2b(data, digest_size=16).hexdigest(), data, upl.name)
+        frames.append(frame)
+        summaries.append(row)
 
-    df = pd.DataFrame(all_rows)
+    if len(frames) > 1:
+        # Concatenating categoricals with different categories falls back to object.
+        df = pd.concat(frames, ignore_index=True).astype({col: "category" for col in CATEGORIES})
+    else:
+        df = frames[0]
     sumdf = pd.DataFrame(summaries).drop_duplicates(subset=["report"])
 
     col1, col2, col3 = st.columns([2,2,3], gap="large")
@@ -61,18 +67,27 @@ if uploads:
 
     with col2:
         st.subheader("🔎 Filter findings")
-        rule_sel = st.multiselect("Rule", sorted(df["rule"].unique()))
-        sev_sel = st.multiselect("Severity", sorted(df["severity"].unique()))
-        file_sel = st.text_input("Filter by file path contains", "")
+        rule_sel = st.multiselect("Rule", sorted(df["rule"].cat.categories), key="rule_sel")
+        sev_sel = st.multiselect("Severity", sorted(df["severity"].cat.categories), key="sev_sel")
+        file_sel = st.text_input("Filter by file path contains", "", key="file_sel")
 
-        mask = pd.Series([True]*len(df))
-        if rule_sel: mask &= df["rule"].isin(rule_sel)
-        if sev_sel: mask &= df["severity"].isin(sev_sel)
-        if file_sel: mask &= df["file"].str.contains(file_sel, case=False, na=False)
-
-        filtered = df[mask].sort_values(["report","file","line"]).reset_index(drop=True)
+        # Profiled reports rank by measured time, others by static cost weight.
+        if df["cumtime"].notna().any():
+            order, ascending = ["cumtime", "weight"], [False, False]
+        elif df["weight"].notna().any():
+            order, ascending = ["weight", "report", "file", "line"], [False, True, True, True]
+        else:
+            order, ascending = ["report", "file", "line"], True
+        filtered = filter_findings(df, rule_sel, sev_sel, file_sel)
+        filtered = filtered.sort_values(order, ascending=ascending).reset_index(drop=True)
         st.metric("Shown findings", len(filtered))
-        st.dataframe(filtered, use_container_width=True)
+
+        # Render one page at a time; st.dataframe serialises every row it is given.
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+        pages = max(1, -(-len(filtered) // page_size))
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+        first = (int(page) - 1) * page_size
+        st.dataframe(filtered.iloc[first:first + page_size], use_container_width=True)
 
     with col3:
         st.subheader("🧩 Code context")
@@ -202,20 +217,23 @@ def suggest_fix(rule, before_lines):
     # Fallback
     return None, "No auto-fix heuristic available; see rule guidance."
 
-# UI: pick a row from the filtered table above
-# Ensure 'filtered' is always defined
-filtered = pd.DataFrame()
-if uploads and not df.empty:
-    # Recompute filtered mask as above
-    rule_sel = st.session_state.get("rule_sel", [])
-    sev_sel = st.session_state.get("sev_sel", [])
-    file_sel = st.session_state.get("file_sel", "")
-    mask = pd.Series([True]*len(df))
-    if rule_sel: mask &= df["rule"].isin(rule_sel)
-    if sev_sel: mask &= df["severity"].isin(sev_sel)
-    if file_sel: mask &= df["file"].str.contains(file_sel, case=False, na=False)
-    filtered = df[mask].sort_values(["report","file","line"]).reset_index(drop=True)
+def real_fix(path, rule):
+    """Unified diff of what `greenlint --fix` would change for this rule, if anything."""
+    try:
+        from greenlint.fix import FIXABLE, fix_source, unified_diff
+    except ImportError:
+        return None
+    if rule not in FIXABLE or not str(path).endswith(".py"):
+        return None
+    try:
+        source = pathlib.Path(path).read_text(encoding="utf-8")
+    except Exception:
+        return None
+    new, applied = fix_source(source, str(path), rules=(rule,))
+    return unified_diff(str(path), source, new) if applied else None
 
+# UI: pick a row from the filtered table above (same filters, computed once)
+if uploads and not df.empty:
     st.markdown("Select a finding row (index from the filtered table) to preview:")
     idx2 = st.number_input("Row index", min_value=0, max_value=max(0, len(filtered)-1), value=0, step=1)
     if len(filtered) > 0:
@@ -227,6 +245,11 @@ if uploads and not df.empty:
         if numbered:
             st.code(numbered, language="python")  # good enough for .py or .java display
 
+            patch = real_fix(row["file"], row["rule"])
+            if patch:
+                st.markdown("**Fix (applied by `greenlint --fix`):**")
+                st.code(patch, language="diff")
+
             after, note = suggest_fix(row["rule"], ctx)
             st.markdown("**Suggested After:**")
             if after:
@@ -238,3 +261,59 @@ if uploads and not df.empty:
             st.info("Could not read local source file. Run the dashboard from the repo root (so relative paths resolve), or copy/paste code here.")
     else:
         st.info("No findings available to preview.")
+
+# --- Build trends (from `greenlint record`) ---
+import datetime as dt
+
+st.subheader("📉 Trends across builds")
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_trends(path, mtime, since_day, until_day):
+    """Builds and daily rollups between two dates; `mtime` invalidates the cache."""
+    from greenlint.trends import TrendStore
+    since = dt.datetime.combine(since_day, dt.time(), dt.timezone.utc)
+    until = dt.datetime.combine(until_day + dt.timedelta(days=1), dt.time(), dt.timezone.utc)
+    days = (since.date().isoformat(), until.date().isoformat())
+    with TrendStore(path) as store:
+        builds = pd.DataFrame(store.builds(int(since.timestamp()), int(until.timestamp())))
+        daily = pd.DataFrame(store.daily(*days))
+        rules = pd.DataFrame(store.daily_rules(*days))
+    return builds, daily, rules
+
+store_path = st.text_input("Trend store (SQLite, filled by `greenlint record`)",
+                           os.environ.get("GREENLINT_TRENDS", "greenlint_trends.db"))
+if store_path and os.path.exists(store_path):
+    today = dt.datetime.now(dt.timezone.utc).date()
+    picked = st.date_input("Date range", (today - dt.timedelta(days=90), today))
+    # Mid-selection the widget returns a single date.
+    if not isinstance(picked, (tuple, list)):
+        picked = (picked,)
+    since_day, until_day = picked[0], picked[-1]
+    # Appends land in the -wal file until SQLite checkpoints them.
+    mtime = max(os.path.getmtime(p) for p in (store_path, store_path + "-wal") if os.path.exists(p))
+    builds, daily, rules = load_trends(store_path, mtime, since_day, until_day)
+    if builds.empty:
+        st.info("No builds recorded in this date range.")
+    else:
+        st.metric("Builds", len(builds))
+        # Per-build points get unreadable past a few hundred builds; use the daily rollups then.
+        per_build = len(builds) <= 500
+        if per_build:
+            series = builds.assign(when=pd.to_datetime(builds["recorded_at"], unit="s")).set_index("when")
+        else:
+            series = daily.assign(when=pd.to_datetime(daily["day"])).set_index("when")
+        tcol1, tcol2 = st.columns(2)
+        with tcol1:
+            st.caption("Score" + ("" if per_build else " (daily mean)"))
+            st.line_chart(series[["score"]])
+        with tcol2:
+            st.caption("Scan duration, seconds" + ("" if per_build else " (daily mean)"))
+            st.line_chart(series[["duration"]])
+        if not rules.empty:
+            st.caption("Findings per build by rule (daily mean)")
+            per_rule = rules.assign(findings=rules["findings"] / rules["builds"])
+            st.area_chart(per_rule.pivot(index="day", columns="rule", values="findings").fillna(0))
+        with st.expander("Builds"):
+            st.dataframe(builds.sort_values("recorded_at", ascending=False).head(1000), use_container_width=True)
+else:
+    st.info("Record builds with `greenlint record greenlint_report.json` to chart score and duration over time.")
@@ -0,0 +1,110 @@
+"""Baselines: fingerprints of accepted findings, so only new ones are reported.
+
+A fingerprint hashes the rule id, the finding's source line with whitespace
+collapsed, the names of the enclosing def/class lines, the file path
+relative to the scan root and an ordinal among otherwise identical
+findings in that file. Line numbers are left out, so edits elsewhere in a
+file do not invalidate its entries.
+
+The file is a short header followed by the sorted fingerprints as
+little-endian uint64s, which loads with one frombytes call into a set.
+"""
+import hashlib
+import os
+import re
+import struct
+import sys
+from array import array
+
+MAGIC = b"GLBASE"
+FORMAT = 1
+_HEADER = struct.Struct("<6sHQ")
+# Lines that open a block; anything else less indented than the line below
+# it is a continuation (closing brackets, string bodies) and is skipped.
+_OPENER = re.compile(r"\s*(?:async\s+)?(?:(def|class)\s+(\w+)"
+                     r"|(?:for|while|if|elif|else|try|except|finally|with|match|case)\b)")
+
+
+class BaselineError(ValueError):
+    pass
+
+
+def _scopes(lines, lineno):
+    # Dotted names of the def/class lines enclosing `lineno`. Works on the
+    # text alone, so the file is not parsed a second time.
+    names = []
+    line = lines[lineno - 1]
+    indent = len(line) - len(line.lstrip())
+    for i in range(lineno - 2, -1, -1):
+        if indent == 0:
+            break
+        line = lines[i]
+        stripped = line.lstrip()
+        width = len(line) - len(stripped)
+        if width >= indent or not stripped:
+            continue
+        m = _OPENER.match(line)
+        if m is None:
+            continue
+        if m.group(1):
+            names.append(m.group(2))
+        indent = width
+    return ".".join(reversed(names))
+
+
+class Fingerprinter:
+    """Assigns fingerprints to findings, one file's batch at a time."""
+
+    def __init__(self, root):
+        root = os.path.abspath(root)
+        self.root = root if os.path.isdir(root) else os.path.dirname(root)
+        self.seen = {}
+
+    def __call__(self, path, findings):
+        """Fingerprints of `findings` (all from `path`), in the same order."""
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        lines = None
+        if path.endswith(".py") and any(f.lineno for f in findings):
+            try:
+                with open(path, encoding="utf-8", errors="replace") as fp:
+                    lines = fp.read().splitlines()
+            except OSError:
+                pass
+        out = []
+        for f in findings:
+            text = scope = ""
+            if lines is not None and 0 < f.lineno <= len(lines):
+                text = " ".join(lines[f.lineno - 1].split())
+                scope = _scopes(lines, f.lineno)
+            key = "\0".join((rel, f.rule_id, scope, text))
+            ordinal = self.seen[key] = self.seen.get(key, -1) + 1
+            data = f"{key}\0{ordinal}".encode("utf-8", "surrogatepass")
+            out.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little"))
+        return out
+
+
+def write_baseline(path, fingerprints):
+    values = array("Q", sorted(set(fingerprints)))
+    if sys.byteorder == "big":
+        values.byteswap()
+    with open(path, "wb") as fp:
+        fp.write(_HEADER.pack(MAGIC, FORMAT, len(values)))
+        fp.write(values.tobytes())
+
+
+def load_baseline(path):
+    """The set of fingerprints stored in a baseline file."""
+    with open(path, "rb") as fp:
+        data = fp.read()
+    if len(data) < _HEADER.size:
+        raise BaselineError(f"{path}: not a greenlint baseline")
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT:
+        raise BaselineError(f"{path}: not a greenlint baseline (or an unsupported version)")
+    values = array("Q")
+    if len(data) - _HEADER.size != count * values.itemsize:
+        raise BaselineError(f"{path}: truncated baseline")
+    values.frombytes(data[_HEADER.size:])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return set(values)
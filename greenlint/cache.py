@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import tempfile
+from . import __version__
+
+DEFAULT_CACHE_DIR = ".greenlint_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bump whenever the shape of cached rows changes.
+CACHE_FORMAT = 3
+
+
+class ResultCache:
+    """On-disk cache of per-file results keyed by file content.
+
+    An entry is a JSON object; the scanner stores {"rows": [...]} plus,
+    when the call-graph index is on, the file's "facts".
+
+    Keys hash the file bytes together with the greenlint version and the
+    rule ids the scan runs (passed to key(); see registry.salt), so upgrading
+    or changing the rule set never serves stale results. Entries are written
+    to a temp file and renamed into place, which keeps concurrent writers
+    (parallel workers, CI agents sharing the directory) from ever exposing a
+    partial entry.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.salt = f"{CACHE_FORMAT}\0{__version__}\0".encode()
+
+    def key(self, data, rule_ids=()):
+        h = hashlib.blake2b(self.salt, digest_size=20)
+        h.update(f"{','.join(sorted(rule_ids))}\0".encode())
+        h.update(data)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:] + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as fp:
+                entry = json.load(fp)
+            # Refresh mtime so eviction drops the least recently used entries.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        subdir = os.path.dirname(path)
+        try:
+            os.makedirs(subdir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=subdir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump(entry, fp, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for root, _dirs, names in os.walk(self.directory):
+            if root == self.directory:
+                # Top-level files (the call-graph index) are not cache entries.
+                continue
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return 0
+        entries.sort()
+        # Trim well below the limit so we don't prune again on the next run.
+        target = self.max_bytes * 0.8
+        removed = 0
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,358 @@
+"""Project-wide index of functions that do network or file I/O.
+
+The loop rules only see calls written directly in a loop body. To catch a
+loop that calls a helper which calls `requests.get`, each file contributes a
+small JSON-able summary ("facts") gathered during the normal single pass:
+
+    {"imports": {alias: dotted target, leading dots for relative imports},
+     "defs": {qualname: [{kind: sink call}, [called names]]},
+     "loops": [[lineno, called name, enclosing qualname, depth, iterations]]}
+
+Facts are stored with each file's cache entry, so they are only recomputed
+for files whose content changed. ProjectIndex joins them after the scan,
+propagates effects up the call graph, and reports loop call sites that reach
+network ("net") or file ("io") I/O. The index itself is persisted next to
+the result cache so that --since scans can still resolve helpers in files
+they did not scan. Sharded scans read the facts of every file and report
+only their own.
+"""
+import ast
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+from .engine import FUNCTION_TYPES, Dispatcher
+from .rules import Finding, LargeFileIoInLoop, UnbatchedRequests, call_name
+
+INDEX_FILE = "index.json"
+INDEX_FORMAT = 1
+# Effect kind -> rule reported when a loop reaches it.
+EFFECT_RULES = {"net": UnbatchedRequests, "io": LargeFileIoInLoop}
+# Re-export chains followed when resolving an import (pkg/__init__ -> pkg.mod).
+MAX_HOPS = 8
+
+
+def dotted_name(node):
+    """'a.b.c' for a Name or chain of Attributes on a Name, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _effect(node):
+    name = call_name(node.func)
+    if name in UnbatchedRequests.network_calls:
+        return "net", name
+    func = node.func
+    attr = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+    if attr in LargeFileIoInLoop.suspicious_funcs:
+        return "io", attr
+    return None
+
+
+class FactsCollector:
+    """Rule-like visitor that fills ctx.facts; run it through the Dispatcher."""
+
+    id = "index"
+    node_types = FUNCTION_TYPES + (ast.Import, ast.ImportFrom, ast.Call)
+    in_loop = False
+
+    def visit(self, node, ctx):
+        facts = ctx.facts
+        if facts is None:
+            facts = ctx.facts = {"imports": {}, "defs": {}, "loops": []}
+        if isinstance(node, FUNCTION_TYPES):
+            qualname = ctx.qualname
+            qualname = f"{qualname}.{node.name}" if qualname else node.name
+            facts["defs"].setdefault(qualname, [{}, []])
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    facts["imports"][alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".")[0]
+                    facts["imports"][head] = head
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * node.level + (node.module + "." if node.module else "")
+            for alias in node.names:
+                if alias.name != "*":
+                    facts["imports"][alias.asname or alias.name] = base + alias.name
+        else:
+            self._call(node, ctx, facts)
+
+    def _call(self, node, ctx, facts):
+        owner = None
+        if ctx.functions:
+            owner = facts["defs"].get(ctx.qualname)
+        effect = _effect(node)
+        if effect is not None:
+            # Direct I/O in a loop is already reported by the rules themselves.
+            if owner is not None:
+                owner[0].setdefault(*effect)
+            return
+        name = dotted_name(node.func)
+        if name is None:
+            return
+        if owner is not None and name not in owner[1]:
+            owner[1].append(name)
+        if ctx.loops:
+            facts["loops"].append([node.lineno, name, ctx.qualname, ctx.loop_depth, ctx.iterations()])
+
+
+COLLECTOR = FactsCollector()
+
+
+def collect_facts(data):
+    """Facts for one file's source bytes, or None if it has none or does not parse."""
+    try:
+        tree = ast.parse(data.decode("utf-8"))
+    except Exception:
+        return None
+    return trim_facts(Dispatcher([COLLECTOR]).walk("", tree).facts)
+
+
+def trim_facts(facts):
+    if facts is None or not (facts["defs"] or facts["loops"] or facts["imports"]):
+        return None
+    return facts
+
+
+def digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _module_name(rel_path):
+    # "pkg/mod.py" -> ("pkg.mod", False); "pkg/__init__.py" -> ("pkg", True)
+    parts = rel_path[:-3].split("/") if rel_path.endswith(".py") else rel_path.split("/")
+    if parts[-1] == "__init__":
+        return ".".join(parts[:-1]), True
+    return ".".join(parts), False
+
+
+class ProjectIndex:
+    """Facts for every file under `root`, keyed by root-relative POSIX path.
+
+    Pass `path` to persist the index between runs. Entries are
+    [mtime_ns, size, digest, facts]; a file whose stat changed is re-read and
+    only re-parsed if its digest changed too.
+    """
+
+    def __init__(self, root, path=None):
+        root = os.path.abspath(root)
+        self.root = root if os.path.isdir(root) else os.path.dirname(root)
+        self.path = path
+        self.entries = {}
+        self.scanned = []
+        self._effects = None
+
+    def load(self):
+        if self.path is None:
+            return self
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                doc = json.load(fp)
+        except (OSError, ValueError):
+            return self
+        if doc.get("format") == INDEX_FORMAT:
+            self.entries = doc.get("files", {})
+        return self
+
+    def save(self):
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump({"format": INDEX_FORMAT, "files": self.entries}, fp, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def known(self, path):
+        return self._rel(path) in self.entries
+
+    def update(self, path, file_digest, facts, scanned=True):
+        """Record the facts of a file read in this run; findings() covers it
+        only if it was `scanned` (rather than read for its facts alone)."""
+        rel = self._rel(path)
+        if scanned:
+            self.scanned.append((path, rel))
+        self._effects = None
+        st = None
+        if facts is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                pass
+        if st is None:
+            self.entries.pop(rel, None)
+        else:
+            self.entries[rel] = [st.st_mtime_ns, st.st_size, file_digest, facts]
+
+    def refresh(self):
+        """Revalidate entries for files not scanned in this run."""
+        scanned = {rel for _path, rel in self.scanned}
+        for rel in list(self.entries):
+            if rel in scanned:
+                continue
+            entry = self.entries[rel]
+            path = os.path.join(self.root, rel)
+            try:
+                st = os.stat(path)
+                if (st.st_mtime_ns, st.st_size) == (entry[0], entry[1]):
+                    continue
+                with open(path, "rb") as fp:
+                    data = fp.read()
+            except OSError:
+                del self.entries[rel]
+                continue
+            file_digest = digest(data)
+            if file_digest != entry[2]:
+                entry[3] = collect_facts(data)
+            entry[:3] = [st.st_mtime_ns, st.st_size, file_digest]
+        self._effects = None
+
+    # --- resolution ---
+
+    def _build(self):
+        self.modules = {}
+        suffixes = {}
+        for rel, entry in self.entries.items():
+            if entry[3] is None or not rel.endswith(".py"):
+                continue
+            name, is_package = _module_name(rel)
+            self.modules[name] = (is_package, entry[3])
+            # Let `import pkg.mod` find src/pkg/mod.py when scanning from above src/.
+            parts = name.split(".")
+            for i in range(1, len(parts)):
+                suffix = ".".join(parts[i:])
+                suffixes[suffix] = None if suffix in suffixes else name
+        self.suffixes = suffixes
+
+    def _module(self, name):
+        if name in self.modules:
+            return name
+        return self.suffixes.get(name)
+
+    def _def(self, module, qualname):
+        defs = self.modules[module][1]["defs"]
+        if qualname in defs:
+            return module, qualname
+        # Instantiating a class runs its __init__.
+        if qualname + ".__init__" in defs:
+            return module, qualname + ".__init__"
+        return None
+
+    def _absolute(self, module, target):
+        if not target.startswith("."):
+            return target
+        stripped = target.lstrip(".")
+        parts = module.split(".") if module else []
+        if not self.modules[module][0]:
+            parts = parts[:-1]
+        level = len(target) - len(stripped)
+        if level > 1:
+            parts = parts[:len(parts) - (level - 1)]
+        return ".".join(parts + [stripped])
+
+    def resolve(self, module, scope, name, hops=0):
+        """(module, qualname) of the function `name` refers to when called in
+        `scope` of `module`, or None if it is not defined in the project."""
+        if hops > MAX_HOPS:
+            return None
+        head, _, rest = name.partition(".")
+        if head in ("self", "cls") and rest and "." not in rest:
+            parts = scope.split(".")
+            for i in range(len(parts) - 1, 0, -1):
+                hit = self._def(module, ".".join(parts[:i] + [rest]))
+                if hit:
+                    return hit
+            return None
+        if not rest:
+            parts = scope.split(".") if scope else []
+            for i in range(len(parts), -1, -1):
+                hit = self._def(module, ".".join(parts[:i] + [head]))
+                if hit:
+                    return hit
+        target = self.modules[module][1]["imports"].get(head)
+        if target is None:
+            return None
+        target = self._absolute(module, target)
+        return self.lookup(f"{target}.{rest}" if rest else target, hops + 1)
+
+    def lookup(self, dotted, hops=0):
+        parts = dotted.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            module = self._module(".".join(parts[:i]))
+            if module is None:
+                continue
+            qualname = ".".join(parts[i:])
+            hit = self._def(module, qualname)
+            if hit is None and parts[i] in self.modules[module][1]["imports"]:
+                # Re-exported, e.g. `from .helpers import fetch` in pkg/__init__.py.
+                hit = self.resolve(module, "", qualname, hops + 1)
+            return hit
+        return None
+
+    def effects(self):
+        """{(module, qualname): {kind: sink}} after propagating through callers."""
+        if self._effects is not None:
+            return self._effects
+        self._build()
+        effects = {}
+        callers = {}
+        for module, (_pkg, facts) in self.modules.items():
+            for qualname, (kinds, calls) in facts["defs"].items():
+                key = (module, qualname)
+                if kinds:
+                    effects[key] = dict(kinds)
+                for name in calls:
+                    callee = self.resolve(module, qualname, name)
+                    if callee is not None and callee != key:
+                        callers.setdefault(callee, []).append(key)
+        queue = deque(effects)
+        while queue:
+            key = queue.popleft()
+            for caller in callers.get(key, ()):
+                mine = effects.setdefault(caller, {})
+                grew = False
+                for kind, sink in effects[key].items():
+                    if kind not in mine:
+                        mine[kind] = sink
+                        grew = True
+                if grew:
+                    queue.append(caller)
+        self._effects = effects
+        return effects
+
+    def findings(self):
+        """Yield (path, findings) for loop calls in scanned files that reach I/O."""
+        effects = self.effects()
+        for path, rel in self.scanned:
+            entry = self.entries.get(rel)
+            if entry is None or entry[3] is None or not rel.endswith(".py"):
+                continue
+            module = _module_name(rel)[0]
+            found = []
+            for lineno, name, scope, depth, iterations in entry[3]["loops"]:
+                callee = self.resolve(module, scope, name)
+                reached = effects.get(callee) if callee is not None else None
+                if not reached:
+                    continue
+                for kind, rule in EFFECT_RULES.items():
+                    if kind in reached:
+                        message = rule.indirect_message.format(call=name, sink=reached[kind])
+                        found.append(Finding(path, lineno, rule.id, message, depth=depth, iterations=iterations))
+            if found:
+                yield path, found
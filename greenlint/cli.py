@@ -1,36 +1,387 @@
 
-import argparse, json
-from .scanner import scan_path
-from .report import summarise
+import argparse, os, sys
+from contextlib import redirect_stdout
+from time import perf_counter
+from . import __version__
+from .writers import COLUMNAR_WRITERS, JsonWriter, SarifWriter, WRITERS
 
-def main():
-    parser = argparse.ArgumentParser(description="GreenLint: prototype sustainable-coding linter")
-    parser.add_argument("target", help="File or directory to scan")
-    parser.add_argument("--json", dest="json_out", help="Write JSON report to this path")
-    args = parser.parse_args()
+# Everything else (rules, scanner, git helpers, ...) is imported once the
+# arguments are parsed, so --version and --help start quickly.
 
-    findings = scan_path(args.target)
-    summary = summarise(findings)
+# Findings echoed to the console; the full set goes to the report file.
+DETAIL_LIMIT = 50
 
+def _shard(value):
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and N, got {value!r}")
+    return index, count
+
+def _print_summary(summary):
     print("=== GreenLint Prototype ===")
     print(f"Total findings: {summary['total_findings']}  |  Score: {summary['score']} / 100")
+    print(f"Weighted cost: {summary['weighted_cost']} over {summary['lines_of_code']} lines")
     print("By rule:")
     for rid, count in summary["by_rule"].items():
         print(f"  - {rid}: {count}")
-    print("\nDetail:")
-    for f in findings[:50]:
-        rid = getattr(f, "rule_id", getattr(f, "rule", "UNKNOWN"))
-        print(f"{f.file}:{f.lineno} {rid} {f.message}")
 
+def merge_main(argv):
+    from .report import merge_reports
+    parser = argparse.ArgumentParser(prog="greenlint merge",
+                                     description="Combine per-shard JSON reports into one report")
+    parser.add_argument("reports", nargs="+", help="JSON reports to merge")
+    parser.add_argument("--json", dest="json_out", required=True, help="Write the merged report to this path")
+    args = parser.parse_args(argv)
+
+    with open(args.json_out, "w", encoding="utf-8") as fp:
+        summary = merge_reports(args.reports, JsonWriter(fp))
+    _print_summary(summary)
+    print(f"\nMerged report written to {args.json_out}")
+
+def serve_main(argv):
+    from .server import Workspace, serve_stdio, serve_unix
+    parser = argparse.ArgumentParser(prog="greenlint serve",
+                                     description="Keep parsed files in memory and answer check requests")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--socket",
+                           help="Unix socket to listen on (default: per-user socket in $XDG_RUNTIME_DIR or /tmp)")
+    transport.add_argument("--stdio", action="store_true", help="Serve newline-delimited JSON on stdin/stdout")
+    parser.add_argument("--capacity", type=int, default=4096, help="Files kept in the in-memory LRU")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB")
+    args = parser.parse_args(argv)
+
+    workspace = Workspace(args.capacity, exclude=args.exclude)
+    try:
+        if args.stdio:
+            serve_stdio(workspace)
+        else:
+            serve_unix(workspace, args.socket)
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        parser.error(str(e))
+
+def watch_main(argv):
+    from .server import Workspace, watch
+    parser = argparse.ArgumentParser(prog="greenlint watch",
+                                     description="Re-check files as they change and print their findings")
+    parser.add_argument("target", help="File or directory to watch")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument("--poll", action="store_true", help="Poll even where inotify is available")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB")
+    args = parser.parse_args(argv)
+
+    def report(findings, removed):
+        for path in removed:
+            print(f"{path}: removed")
+        for path, items in findings.items():
+            print(f"{path}: {len(items)} finding(s)")
+            for f in items:
+                print(f"  {f.file}:{f.lineno} {f.rule_id} {f.message}")
+        sys.stdout.flush()
+
+    workspace = Workspace(exclude=args.exclude)
+    print(f"Watching {args.target} (Ctrl-C to stop)")
+    sys.stdout.flush()
+    try:
+        watch(workspace, args.target, report, interval=args.interval, use_inotify=not args.poll)
+    except KeyboardInterrupt:
+        pass
+
+def profile_main(argv):
+    import pstats
+    from .callgraph import ProjectIndex
+    from .hotspots import rank, run_script
+    from .report import Summary
+    from .scanner import iter_file_results
+    parser = argparse.ArgumentParser(prog="greenlint profile",
+                                     description="Rank findings by the measured runtime of the code they sit in")
+    parser.add_argument("target", help="File or directory to scan")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pstats", metavar="FILE", help="Saved cProfile / pstats dump")
+    source.add_argument("--run", metavar="COMMAND",
+                        help="Run 'script.py [args...]' under cProfile and use its profile")
+    parser.add_argument("--save", metavar="FILE", help="With --run, also dump the raw profile here")
+    parser.add_argument("-o", "--output", help="Write the ranked JSON report to this path")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, default=20, help="Findings to print (default: 20)")
+    parser.add_argument("--index", action="store_true",
+                        help="Also follow calls from loops into project functions that do network or file I/O")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = pstats.Stats(args.pstats) if args.pstats else run_script(args.run, args.save)
+    except (OSError, TypeError, ValueError) as e:
+        parser.error(f"cannot load profile: {e}")
+    summary = Summary()
+    findings = []
+    index = ProjectIndex(args.target) if args.index else None
+    for _file, lines, items in iter_file_results(args.target, jobs=args.jobs, index=index):
+        summary.add_lines(lines)
+        for f in items:
+            summary.add(f)
+            findings.append(f)
+    ranked = rank(findings, stats)
+    result = summary.as_dict()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            writer = JsonWriter(fp)
+            for item in ranked:
+                writer.write(item)
+            writer.close(result, profile={"source": args.pstats or args.run, "total_time": stats.total_tt})
+
+    _print_summary(result)
+    print(f"\nBy measured cost (profile total {stats.total_tt:.3f}s):")
+    for item in ranked[:args.limit]:
+        print(f"{item['cumtime']:>10.3f}s {item['calls']:>8} calls  "
+              f"{item['file']}:{item['line']} {item['rule']} in {item['function']}")
+    if args.output:
+        print(f"\nJSON report written to {args.output}")
+
+def record_main(argv):
+    from .trends import DEFAULT_STORE, TrendStore, build_commit, read_summary
+    parser = argparse.ArgumentParser(prog="greenlint record",
+                                     description="Append a report's summary to the build trend store")
+    parser.add_argument("report", help="JSON, Arrow or Parquet report of this build")
+    parser.add_argument("--db", default=DEFAULT_STORE, help=f"SQLite trend store (default: {DEFAULT_STORE})")
+    parser.add_argument("--commit", help="Commit the report is for (default: from CI variables or git HEAD)")
+    parser.add_argument("--branch", help="Branch the report is for (default: from CI variables or git)")
+    parser.add_argument("--duration", type=float, metavar="SECONDS",
+                        help="Scan duration (default: the total time of a --profile report)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary, extra = read_summary(args.report)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot read report: {e}")
+    commit, branch = build_commit()
+    with TrendStore(args.db) as store:
+        build_id = store.record(summary, perf=extra.get("perf"), commit=args.commit or commit,
+                                branch=args.branch or branch, report=os.path.basename(args.report),
+                                duration=args.duration)
+    print(f"Recorded build {build_id} ({summary.get('total_findings', 0)} findings, "
+          f"score {summary.get('score')}) in {args.db}")
 
+SUBCOMMANDS = {"merge": merge_main, "profile": profile_main, "record": record_main, "serve": serve_main,
+               "watch": watch_main}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "client":
+        from .client import main as client_main
+        return client_main(argv[1:])
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(description="GreenLint: prototype sustainable-coding linter")
+    parser.add_argument("--version", action="version", version=f"greenlint {__version__}")
+    parser.add_argument("target", help="File or directory to scan")
+    parser.add_argument("-o", "--output", help="Write the report to this path")
+    parser.add_argument("--format", choices=sorted({**WRITERS, **COLUMNAR_WRITERS}), default="json",
+                        help="Report format for --output (default: json; arrow and parquet need pyarrow)")
+    parser.add_argument("--json", dest="json_out",
+                        help="Write JSON report to this path (same as --format json -o PATH)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--cache-dir", help="Directory for cached results (default: .greenlint_cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the result cache")
+    parser.add_argument("--shard", type=_shard, metavar="i/N",
+                        help="Only scan the i-th of N deterministic slices of the tree (1-based)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Skip files and directories matching GLOB (repeatable)")
+    parser.add_argument("--no-gitignore", action="store_true", help="Do not honour .gitignore files")
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument("--since", metavar="REF",
+                         help="Only scan files changed or added relative to a git ref")
+    changes.add_argument("--staged", action="store_true", help="Only scan files staged in the git index")
+    parser.add_argument("--changed-lines", action="store_true",
+                        help="With --since/--staged, only report findings on changed lines "
+                             "(with --staged, staged files must have no other changes)")
+    parser.add_argument("--index", action="store_true",
+                        help="Also follow calls from loops into project functions that do network or file I/O "
+                             "(parses most files, so scans are slower)")
+    parser.add_argument("--select", action="append", metavar="PREFIXES",
+                        help="Only run rules whose id starts with one of these comma-separated prefixes, "
+                             "e.g. PY,AI001 (default: all built-in and installed rules)")
+    parser.add_argument("--ignore", action="append", metavar="PREFIXES",
+                        help="Do not run rules whose id starts with one of these prefixes")
+    parser.add_argument("--no-prefilter", action="store_true",
+                        help="Parse every file and run every rule, even when no rule's trigger text appears")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="Only report findings not recorded in this baseline (see --write-baseline)")
+    parser.add_argument("--write-baseline", metavar="FILE",
+                        help="Record every finding of this scan in a baseline file")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each scan phase and rule, print a table and add a 'perf' key to the report")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rewrite files to fix PY001, PY003 and PD001 findings where it is safe")
+    parser.add_argument("--diff", action="store_true",
+                        help="Print the fixes as a unified diff on stdout (the report goes to stderr)")
+    args = parser.parse_args(argv)
+    from .cache import DEFAULT_CACHE_DIR, ResultCache
+    from .callgraph import EFFECT_RULES, INDEX_FILE, ProjectIndex
+    from .perf import Profiler, format_table, load_hooks
+    from .registry import select
+    from .report import Summary
+    from .scanner import iter_file_results
+    if args.cache_dir is None:
+        args.cache_dir = DEFAULT_CACHE_DIR
+    if args.changed_lines and not (args.since or args.staged):
+        parser.error("--changed-lines requires --since or --staged")
     if args.json_out:
-        out = {
-            "summary": summary,
-            "findings": [fi.to_dict() for fi in findings],
-        }
-        with open(args.json_out, "w", encoding="utf-8") as fp:
-            json.dump(out, fp, indent=2)
-        print(f"\nJSON report written to {args.json_out}")
+        if args.output:
+            parser.error("--json and --output are mutually exclusive")
+        args.output, args.format = args.json_out, "json"
+    writer_cls = WRITERS.get(args.format) or COLUMNAR_WRITERS[args.format]
+    if args.output and getattr(writer_cls, "binary", False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error(f"--format {args.format} requires pyarrow (pip install 'greenlint[columnar]')")
+
+    try:
+        rule_ids = select(args.select, args.ignore)
+    except KeyError as e:
+        parser.error(f"--select {e.args[0]} matches no known rule")
+    if not rule_ids:
+        parser.error("no rules selected")
+
+    baseline = None
+    if args.baseline:
+        from .baseline import BaselineError, load_baseline
+        try:
+            baseline = load_baseline(args.baseline)
+        except (OSError, BaselineError) as e:
+            parser.error(f"cannot load baseline: {e}")
+    fingerprint = None
+    if baseline is not None or args.write_baseline:
+        from .baseline import Fingerprinter
+        fingerprint, recorded, suppressed = Fingerprinter(args.target), [], 0
+
+    changed = None
+    if args.since or args.staged:
+        from .gitdiff import GitError, changed_files, on_changed_line, unstaged_files
+        try:
+            changed = changed_files(args.target, since=args.since, staged=args.staged)
+            # Staged hunks number the index copy, but the working tree is scanned.
+            partial = sorted(set(changed) & unstaged_files(args.target)) if args.staged and args.changed_lines else []
+        except GitError as e:
+            parser.error(str(e))
+        if partial:
+            parser.error("--changed-lines with --staged needs the working tree to match the index; "
+                         f"stash or stage the other changes to {', '.join(partial)}")
+
+    profiler = None
+    if args.profile:
+        load_hooks()
+        profiler = Profiler()
+        started = perf_counter()
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir)
+    index = None
+    # The index only reports through the network and file I/O rules.
+    if args.index and {r.id for r in EFFECT_RULES.values()} & set(rule_ids):
+        index = ProjectIndex(args.target, None if cache is None else os.path.join(args.cache_dir, INDEX_FILE))
+        index.load()
+    results = iter_file_results(args.target, jobs=args.jobs, cache=cache, shard=args.shard,
+                                exclude=args.exclude, use_gitignore=not args.no_gitignore,
+                                files=None if changed is None else list(changed), profiler=profiler,
+                                prefilter=not args.no_prefilter, index=index, rules=rule_ids)
+
+    fixable = to_fix = None
+    if args.fix or args.diff:
+        from .fix import FIXABLE
+        fixable, to_fix = set(FIXABLE) & set(rule_ids), {}
+
+    out = writer = None
+    if args.output:
+        if getattr(writer_cls, "binary", False):
+            out = open(args.output, "wb")
+        else:
+            out = open(args.output, "w", encoding="utf-8")
+        # SARIF lists the rules of the run up front.
+        writer = writer_cls(out, rules=rule_ids) if writer_cls is SarifWriter else writer_cls(out)
+    summary = Summary()
+    shown = []
+    write = profiler.phase("write") if profiler is not None else None
+    try:
+        for path, lines, findings in results:
+            summary.add_lines(lines)
+            if args.changed_lines:
+                findings = [f for f in findings if on_changed_line(f, changed)]
+            if fingerprint is not None and findings:
+                prints = fingerprint(path, findings)
+                if args.write_baseline:
+                    recorded.extend(prints)
+                if baseline is not None:
+                    kept = [f for f, fp in zip(findings, prints) if fp not in baseline]
+                    suppressed += len(findings) - len(kept)
+                    findings = kept
+            for f in findings:
+                summary.add(f)
+                if writer is not None:
+                    if write is None:
+                        writer.write(f.to_dict())
+                    else:
+                        with write:
+                            writer.write(f.to_dict())
+                if len(shown) < DETAIL_LIMIT:
+                    shown.append(f)
+                if fixable is not None and f.rule_id in fixable:
+                    to_fix.setdefault(f.file, None)
+        result = summary.as_dict()
+        if args.write_baseline:
+            from .baseline import write_baseline
+            write_baseline(args.write_baseline, recorded)
+        if index is not None:
+            index.save()
+        if cache is not None:
+            cache.prune()
+        extra = {}
+        if profiler is not None:
+            profiler.add_phase("total", perf_counter() - started)
+            extra["perf"] = stats = profiler.finish()
+        if writer is not None:
+            writer.close(result, **extra)
+    finally:
+        if out is not None:
+            out.close()
+
+    # With --diff, stdout carries only the patch.
+    console = sys.stderr if args.diff else sys.stdout
+    fixes = files = 0
+    if to_fix:
+        from .fix import fix_files
+        for path, diff, applied in fix_files(to_fix, write=args.fix, rules=tuple(sorted(fixable))):
+            if args.diff:
+                sys.stdout.write(diff)
+            fixes += len(applied)
+            files += 1
+
+    with redirect_stdout(console):
+        _print_summary(result)
+        print("\nDetail:")
+        for f in shown:
+            print(f"{f.file}:{f.lineno} {f.rule_id} {f.message}")
+
+        if profiler is not None:
+            print("\nProfile:")
+            print(format_table(stats))
+
+        if baseline is not None:
+            print(f"\nSuppressed {suppressed} finding(s) recorded in {args.baseline}")
+        if args.write_baseline:
+            print(f"\nBaseline of {len(recorded)} finding(s) written to {args.write_baseline}")
+        if args.output:
+            print(f"\n{args.format.upper()} report written to {args.output}")
+        if to_fix is not None:
+            verb = "Applied" if args.fix else "Found"
+            print(f"\n{verb} {fixes} fix(es) in {files} file(s)")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
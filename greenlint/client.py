@@ -0,0 +1,56 @@
+"""Thin client for `greenlint serve`.
+
+Deliberately imports nothing from the scanner so that asking a running
+daemon for findings costs little more than interpreter startup.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+
+def default_socket():
+    base = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(base, f"greenlint-{os.getuid()}.sock")
+
+
+def request(payload, socket_path=None, timeout=None):
+    """Send one request to the daemon and return its decoded reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket())
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as fp:
+            line = fp.readline()
+    if not line:
+        raise ConnectionError("greenlint daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="greenlint client",
+                                     description="Ask a running `greenlint serve` daemon to check a path")
+    parser.add_argument("path", help="File or directory to check")
+    parser.add_argument("--socket", help=f"Daemon socket (default: {default_socket()})")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON reply")
+    args = parser.parse_args(argv)
+
+    try:
+        reply = request({"op": "check", "path": os.path.abspath(args.path)}, args.socket)
+    except OSError as e:
+        print(f"greenlint client: cannot reach daemon: {e}", file=sys.stderr)
+        return 2
+    if "error" in reply:
+        print(f"greenlint client: {reply['error']}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(reply))
+        return 0
+    for f in reply["findings"]:
+        print(f"{f['file']}:{f['line']} {f['rule']} {f['message']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
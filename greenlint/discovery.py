@@ -0,0 +1,196 @@
+import os
+import re
+from fnmatch import fnmatch
+from .rules import LargeModelFile
+
+DEFAULT_EXCLUDES = (
+    ".git", ".hg", ".svn", ".venv", "venv", "node_modules", "__pycache__",
+    "build", "dist", ".tox", ".nox", ".mypy_cache", ".pytest_cache",
+    ".ruff_cache", ".greenlint_cache", "*.egg-info",
+)
+ARTIFACT_EXTENSIONS = LargeModelFile.extensions
+
+
+def _translate(pattern):
+    # Convert one gitignore glob into a regex over "/"-separated paths.
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i) and i + 2 == n:
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class GitIgnore:
+    """The rules of one .gitignore file, matched relative to its directory."""
+
+    def __init__(self, lines):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                self.rules.append((_translate(line), negate, dir_only, anchored))
+
+    @classmethod
+    def load(cls, directory):
+        try:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="replace") as fp:
+                return cls(fp)
+        except OSError:
+            return None
+
+    def match(self, rel_path, is_dir, current=None):
+        """Return True/False if a rule decides rel_path, else `current`."""
+        name = rel_path.rpartition("/")[2]
+        for regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path if anchored else name):
+                current = not negate
+        return current
+
+
+def iter_files(root, exclude=DEFAULT_EXCLUDES, use_gitignore=True):
+    """Lazily yield (path, rel_path, size) for scannable files under root.
+
+    Python sources get size None; model artifacts get their size from the
+    directory entry's stat, so they are never opened. Excluded and ignored
+    directories are pruned before being descended into, and entries are
+    visited in sorted order so the output is deterministic.
+    """
+    root = os.fspath(root)
+    if not os.path.isdir(root):
+        name = os.path.basename(root)
+        size = os.stat(root).st_size if name.endswith(ARTIFACT_EXTENSIONS) else None
+        yield root, name, size
+        return
+    exclude = tuple(exclude)
+    yield from _walk(root, "", exclude, [] if use_gitignore else None)
+
+
+def iter_dirs(root, exclude=DEFAULT_EXCLUDES, use_gitignore=True):
+    """Yield root and every directory under it that iter_files would descend into."""
+    root = os.fspath(root)
+    if not os.path.isdir(root):
+        return
+    yield root
+    for path, _rel_path, _size in _walk(root, "", tuple(exclude), [] if use_gitignore else None, dirs=True):
+        yield path
+
+
+def iter_paths(root, paths, exclude=DEFAULT_EXCLUDES):
+    """Yield (path, rel_path, size) like iter_files, for an explicit list of paths.
+
+    Only paths under root are kept, and a path is dropped when any of its
+    directories or the file itself matches an exclude glob.
+    """
+    root = os.fspath(root)
+    real_root = os.path.realpath(root)
+    single = not os.path.isdir(root)
+    exclude = tuple(exclude)
+    for path in sorted(os.path.realpath(p) for p in paths):
+        if single:
+            if path != real_root:
+                continue
+            rel_path, display = os.path.basename(root), root
+        else:
+            rel_path = os.path.relpath(path, real_root).replace(os.sep, "/")
+            if rel_path.startswith("../"):
+                continue
+            display = os.path.join(root, rel_path)
+        parts = rel_path.split("/")
+        if any(_excluded(part, "/".join(parts[:i + 1]), exclude) for i, part in enumerate(parts)):
+            continue
+        name = parts[-1]
+        if name.endswith(".py"):
+            yield display, rel_path, None
+        elif name.endswith(ARTIFACT_EXTENSIONS):
+            try:
+                yield display, rel_path, os.stat(path).st_size
+            except OSError:
+                continue
+
+
+def _excluded(name, rel_path, exclude):
+    return any(fnmatch(name, pat) or fnmatch(rel_path, pat) for pat in exclude)
+
+
+def _walk(directory, prefix, exclude, ignores, dirs=False):
+    # Yields files, or with `dirs` the directories walked into instead.
+    if ignores is not None:
+        gitignore = GitIgnore.load(directory)
+        if gitignore is not None:
+            ignores = ignores + [(prefix, gitignore)]
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        name = entry.name
+        rel_path = prefix + name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if _excluded(name, rel_path, exclude):
+            continue
+        if ignores:
+            ignored = None
+            for base, gitignore in ignores:
+                ignored = gitignore.match(rel_path[len(base):], is_dir, ignored)
+            if ignored:
+                continue
+        if is_dir:
+            if dirs:
+                yield entry.path, rel_path, None
+            yield from _walk(entry.path, rel_path + "/", exclude, ignores, dirs)
+        elif dirs:
+            continue
+        elif name.endswith(".py"):
+            yield entry.path, rel_path, None
+        elif name.endswith(ARTIFACT_EXTENSIONS):
+            try:
+                yield entry.path, rel_path, entry.stat().st_size
+            except OSError:
+                continue
@@ -0,0 +1,144 @@
+import ast
+from .symbols import SymbolTable
+
+# Node types that open a loop context for the nodes beneath them.
+LOOP_TYPES = (ast.For, ast.AsyncFor)
+FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Trip count assumed for a loop whose length cannot be read off the source.
+DEFAULT_ITERATIONS = 100
+
+_EXIT_LOOP = object()
+_EXIT_FUNCTION = object()
+_EXIT_CLASS = object()
+
+
+def literal_range(loop):
+    """Trip count of `for ... in range(<int literals>)`, or None if not known statically."""
+    call = loop.iter
+    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == "range"
+            and not call.keywords and 1 <= len(call.args) <= 3):
+        return None
+    try:
+        args = [ast.literal_eval(arg) for arg in call.args]
+        if not all(type(a) is int for a in args):
+            return None
+        return len(range(*args))
+    except (ValueError, TypeError, SyntaxError, OverflowError):
+        return None
+
+
+class Context:
+    """Traversal state shared by every rule during a single walk of one file."""
+
+    __slots__ = ("file_path", "tree", "loops", "functions", "scopes", "findings", "facts", "_symbols")
+
+    def __init__(self, file_path, tree=None):
+        self.file_path = file_path
+        self.tree = tree
+        self.loops = []
+        self.functions = []
+        # Enclosing functions and classes, outermost first.
+        self.scopes = []
+        self.findings = []
+        # Per-file data collected for project-wide analysis (see callgraph).
+        self.facts = None
+        self._symbols = {}
+
+    @property
+    def loop_depth(self):
+        return len(self.loops)
+
+    def iterations(self):
+        """Estimated number of times the current node runs: the product of the
+        trip counts of the enclosing loops, DEFAULT_ITERATIONS where unknown."""
+        total = 1
+        for loop in self.loops:
+            n = literal_range(loop)
+            total *= DEFAULT_ITERATIONS if n is None else n
+        return total
+
+    @property
+    def function(self):
+        return self.functions[-1] if self.functions else None
+
+    @property
+    def symbols(self):
+        """SymbolTable of the innermost enclosing function (or the module).
+
+        Tables are built on first use and shared by every rule for the rest
+        of the walk, so each scope is analysed at most once per file.
+        """
+        table = None
+        for scope in (self.tree, *self.functions):
+            cached = self._symbols.get(scope)
+            if cached is None:
+                cached = self._symbols[scope] = SymbolTable(scope, table)
+            table = cached
+        return table
+
+    @property
+    def qualname(self):
+        return ".".join(scope.name for scope in self.scopes)
+
+
+class Dispatcher:
+    """Walks each tree once and feeds every node to the rules interested in its type.
+
+    Rules declare ``node_types`` (the AST classes they want to see) and
+    ``in_loop`` (only call them when the node sits under a loop).  Rules with
+    no ``node_types`` do not inspect the AST and are skipped here.
+    """
+
+    def __init__(self, rules, profiler=None):
+        self.rules = [r for r in rules if r.node_types]
+        self.handlers = {}
+        for rule in self.rules:
+            visit = rule.visit
+            if profiler is not None:
+                visit = profiler.wrap_rule(rule.id, visit)
+            for node_type in rule.node_types:
+                self.handlers.setdefault(node_type, []).append((visit, rule.in_loop))
+
+    def run(self, file_path, tree):
+        return self.walk(file_path, tree).findings
+
+    def walk(self, file_path, tree):
+        ctx = Context(file_path, tree)
+        handlers = self.handlers
+        loops = ctx.loops
+        functions = ctx.functions
+        scopes = ctx.scopes
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if node is _EXIT_LOOP:
+                loops.pop()
+                continue
+            if node is _EXIT_FUNCTION:
+                functions.pop()
+                scopes.pop()
+                continue
+            if node is _EXIT_CLASS:
+                scopes.pop()
+                continue
+
+            for visit, in_loop in handlers.get(type(node), ()):
+                if in_loop and not loops:
+                    continue
+                visit(node, ctx)
+
+            if isinstance(node, LOOP_TYPES):
+                loops.append(node)
+                stack.append(_EXIT_LOOP)
+            elif isinstance(node, FUNCTION_TYPES):
+                functions.append(node)
+                scopes.append(node)
+                stack.append(_EXIT_FUNCTION)
+            elif isinstance(node, ast.ClassDef):
+                scopes.append(node)
+                stack.append(_EXIT_CLASS)
+            children = list(ast.iter_child_nodes(node))
+            children.reverse()
+            stack.extend(children)
+        return ctx
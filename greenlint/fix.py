@@ -0,0 +1,309 @@
+"""Source rewrites for findings with a mechanical fix.
+
+Each file is parsed once with asttokens; fixers run through the normal
+single-pass Dispatcher and record (start, end, text) edits against token
+offsets, which are then applied back to front in one go:
+
+* PY001: hoist a loop-invariant list of hashable values into `<name>_set = set(<name>)` before the loop
+* PY003: turn an f-string passed to logging.debug/info into %-style lazy arguments
+* PD001: rewrite `df.apply(lambda r: r["a"] <op> r["b"], axis=1)` into column arithmetic
+"""
+import ast
+import difflib
+import os
+import re
+import asttokens
+from .engine import Dispatcher
+from .rules import ExcessiveLogging, InefficientMembershipCheck, call_name
+
+FIXABLE = ("PY001", "PY003", "PD001")
+# Format specs that mean the same thing to str.format and to %-formatting.
+_SIMPLE_SPEC = re.compile(r"[-+ 0#]?\d*(\.\d+)?[dfeEgGxXo]?")
+# Nodes that open their own scope; their bindings are not the enclosing scope's.
+_NESTED = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+           ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+# Operator -> (text, precedence).
+_BINOPS = {ast.Add: ("+", 1), ast.Sub: ("-", 1), ast.Mult: ("*", 2), ast.Div: ("/", 2),
+           ast.FloorDiv: ("//", 2), ast.Mod: ("%", 2), ast.Pow: ("**", 3)}
+
+
+class _Fixer:
+    in_loop = False
+
+    def __init__(self, atok, edits):
+        self.atok = atok
+        self.edits = edits
+
+    def replace(self, node, text):
+        start, end = self.atok.get_text_range(node, padded=False)
+        self.edits.append((start, end, text, self.id))
+
+
+class HoistMembership(_Fixer):
+    id = "PY001"
+    node_types = (ast.Compare,)
+    in_loop = True
+    check = InefficientMembershipCheck()
+
+    def __init__(self, atok, edits):
+        super().__init__(atok, edits)
+        # (loop, name) -> whether the set could be hoisted out of that loop.
+        self.hoisted = {}
+
+    def visit(self, node, ctx):
+        for op, container in zip(node.ops, node.comparators):
+            if not (isinstance(op, (ast.In, ast.NotIn)) and isinstance(container, ast.Name)
+                    and self.check.linear_scan(container, ctx)):
+                continue
+            name = container.id
+            loop = ctx.loops[-1]
+            hoisted = f"{name}_set"
+            if (hoisted in ctx.symbols.bindings or not self._only_tested(loop, name)
+                    or not _hashable_elements(ctx.symbols, name)):
+                continue
+            if (loop, name) not in self.hoisted:
+                self.hoisted[loop, name] = self._hoist(loop, name, hoisted)
+            if self.hoisted[loop, name]:
+                self.replace(container, hoisted)
+
+    def _hoist(self, loop, name, hoisted):
+        source = self.atok.text
+        start = self.atok.get_text_range(loop, padded=False)[0]
+        line_start = source.rfind("\n", 0, start) + 1
+        indent = source[line_start:start]
+        if indent.strip():
+            return False
+        # Inserts carry no rule id: only the replacements count as fixes.
+        self.edits.append((line_start, line_start, f"{indent}{hoisted} = set({name})\n", None))
+        return True
+
+    @staticmethod
+    def _only_tested(loop, name):
+        # The set is built once per run of the loop, so the loop must not
+        # touch the list in any way other than membership tests.
+        tested = set()
+        uses = []
+        for part in [loop.target] + loop.body + loop.orelse:
+            for node in ast.walk(part):
+                if isinstance(node, ast.Compare):
+                    tested.update(id(c) for op, c in zip(node.ops, node.comparators)
+                                  if isinstance(op, (ast.In, ast.NotIn)))
+                elif isinstance(node, ast.Name) and node.id == name:
+                    uses.append(id(node))
+        return all(use in tested for use in uses)
+
+
+def _hashable_elements(table, name):
+    # set(name) raises on unhashable elements (nested lists, dicts), so only
+    # hoist when every binding of `name` builds a container of known-hashable
+    # values; parameters and other bindings we cannot see into are unknown.
+    while table is not None and (name in table.declared or name not in table.bindings):
+        table = table.parent
+    if table is None:
+        return False
+    values = _assigned_values(table.scope, name)
+    return len(values) == len(table.bindings[name]) and all(map(_hashable_container, values))
+
+
+def _assigned_values(scope, name):
+    values = []
+    stack = list(scope.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _NESTED):
+            continue
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == name for t in node.targets):
+            values.append(node.value)
+        elif (isinstance(node, ast.AnnAssign) and node.value is not None
+              and isinstance(node.target, ast.Name) and node.target.id == name):
+            values.append(node.value)
+        stack.extend(ast.iter_child_nodes(node))
+    return values
+
+
+def _hashable_container(expr):
+    if isinstance(expr, (ast.List, ast.Tuple, ast.Set)):
+        return all(isinstance(elt, ast.Constant) for elt in expr.elts)
+    if not isinstance(expr, ast.Call):
+        return False
+    func = expr.func
+    if isinstance(func, ast.Attribute):
+        # str.split() and friends give lists of strings.
+        return func.attr in ("split", "rsplit", "splitlines")
+    if not isinstance(func, ast.Name):
+        return False
+    if func.id == "range":
+        return True
+    if func.id in ("list", "tuple", "sorted", "set", "frozenset") and len(expr.args) == 1:
+        arg = expr.args[0]
+        if isinstance(arg, ast.Constant):
+            return isinstance(arg.value, (str, bytes))
+        return _hashable_container(arg)
+    return False
+
+
+class LazyLogging(_Fixer):
+    id = "PY003"
+    node_types = (ast.Call,)
+
+    def visit(self, node, ctx):
+        if call_name(node.func) not in ExcessiveLogging.log_funcs or len(node.args) != 1:
+            return
+        fstring = node.args[0]
+        if not isinstance(fstring, ast.JoinedStr):
+            return
+        fmt, args = [], []
+        for part in fstring.values:
+            if isinstance(part, ast.Constant):
+                fmt.append(part.value.replace("%", "%%"))
+                continue
+            spec = ""
+            if part.format_spec is not None:
+                values = part.format_spec.values
+                if len(values) != 1 or not isinstance(values[0], ast.Constant):
+                    return
+                spec = values[0].value
+                if not _SIMPLE_SPEC.fullmatch(spec) or (spec and part.conversion != -1):
+                    return
+            if spec:
+                # Without a type letter, str.format aligns strings differently from %.
+                if not spec[-1].isalpha():
+                    return
+                fmt.append("%" + spec)
+            else:
+                fmt.append("%" + {114: "r", 97: "a"}.get(part.conversion, "s"))
+            args.append(ast.unparse(part.value))
+        quote = self.atok.get_text(fstring, padded=False).lstrip("fFrR")[:1]
+        if not args:
+            # logging only %-formats when there are arguments, so keep % as is.
+            fmt = [part.value for part in fstring.values]
+        self.replace(fstring, ", ".join([_literal("".join(fmt), quote)] + args))
+
+
+class VectoriseApply(_Fixer):
+    id = "PD001"
+    node_types = (ast.Call,)
+
+    def visit(self, node, ctx):
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and func.attr == "apply" and len(node.args) == 1
+                and len(node.keywords) == 1 and node.keywords[0].arg == "axis"
+                and getattr(node.keywords[0].value, "value", None) == 1):
+            return
+        # The frame is repeated once per column, so it must be cheap and side-effect free.
+        frame = func.value
+        if not isinstance(frame, (ast.Name, ast.Attribute)) or ast.unparse(frame) != self.atok.get_text(frame):
+            return
+        fn = node.args[0]
+        if not (isinstance(fn, ast.Lambda) and len(fn.args.args) == 1 and not fn.args.vararg
+                and not fn.args.kwarg and not fn.args.kwonlyargs and not fn.args.posonlyargs):
+            return
+        # Without a column the body is a scalar, not a Series.
+        if not isinstance(fn.body, ast.BinOp) or not any(isinstance(n, ast.Subscript) for n in ast.walk(fn.body)):
+            return
+        text = _vectorise(fn.body, fn.args.args[0].arg, self.atok.get_text(frame), self.atok)
+        if text is not None:
+            self.replace(node, f"({text})")
+
+
+def _vectorise(expr, row, frame, atok):
+    # Column arithmetic for a row lambda body, reusing the source text of
+    # keys and numbers; None if anything else appears in it.
+    if isinstance(expr, ast.Subscript):
+        key = expr.slice
+        if (isinstance(expr.value, ast.Name) and expr.value.id == row
+                and isinstance(key, ast.Constant) and isinstance(key.value, str)):
+            return f"{frame}[{atok.get_text(key)}]"
+        return None
+    if isinstance(expr, ast.Constant) and type(expr.value) in (int, float):
+        return atok.get_text(expr)
+    if isinstance(expr, ast.BinOp) and type(expr.op) in _BINOPS:
+        left = _vectorise(expr.left, row, frame, atok)
+        right = _vectorise(expr.right, row, frame, atok)
+        if left is None or right is None:
+            return None
+        op, prec = _BINOPS[type(expr.op)]
+        # ** binds right to left, everything else left to right.
+        if _precedence(expr.left) < prec + (op == "**"):
+            left = f"({left})"
+        if _precedence(expr.right) < prec + (op != "**"):
+            right = f"({right})"
+        return f"{left} {op} {right}"
+    return None
+
+
+def _precedence(expr):
+    return _BINOPS[type(expr.op)][1] if isinstance(expr, ast.BinOp) else 9
+
+
+def _literal(text, quote):
+    r = repr(text)
+    if quote == '"' and r[0] == "'" and '"' not in text:
+        r = '"' + r[1:-1].replace("\\'", "'") + '"'
+    return r
+
+
+FIXERS = (HoistMembership, LazyLogging, VectoriseApply)
+
+
+def fix_source(source, path="<unknown>", rules=FIXABLE):
+    """Return (new source, fixed rule ids) with every applicable fix applied.
+
+    Of two overlapping edits only the later one is applied. If the result
+    does not parse, the source is returned unchanged.
+    """
+    try:
+        atok = asttokens.ASTTokens(source, parse=True, filename=path)
+    except (SyntaxError, ValueError):
+        return source, []
+    edits = []
+    fixers = [cls(atok, edits) for cls in FIXERS if cls.id in rules]
+    Dispatcher(fixers).run(path, atok.tree)
+    if not edits:
+        return source, []
+    applied = []
+    out = source
+    last = len(source) + 1
+    # Back to front, so the offsets of edits still to come stay valid.
+    for start, end, text, rule_id in sorted(edits, key=lambda e: (e[0], e[1]), reverse=True):
+        if end > last:
+            continue
+        out = out[:start] + text + out[end:]
+        last = start
+        if rule_id is not None:
+            applied.append(rule_id)
+    try:
+        ast.parse(out, path)
+    except SyntaxError:
+        return source, []
+    applied.reverse()
+    return out, applied
+
+
+def unified_diff(path, old, new):
+    # git-style a/ b/ prefixes for paths under the working directory, so the
+    # output applies with `git apply` or `patch -p1`.
+    rel = os.path.relpath(path)
+    old_name, new_name = (path, path) if rel.startswith("..") else (f"a/{rel}", f"b/{rel}")
+    return "".join(difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True),
+                                        old_name, new_name))
+
+
+def fix_files(paths, write=False, rules=FIXABLE):
+    """Yield (path, diff, fixed rule ids) for each file a fix applies to.
+
+    With `write`, the rewritten source replaces the file.
+    """
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", newline="") as fp:
+                source = fp.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        new, applied = fix_source(source, path, rules)
+        if not applied:
+            continue
+        if write:
+            with open(path, "w", encoding="utf-8", newline="") as fp:
+                fp.write(new)
+        yield path, unified_diff(path, source, new), applied
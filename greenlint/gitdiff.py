@@ -0,0 +1,85 @@
+import os
+import re
+import subprocess
+
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(args, cwd):
+    try:
+        proc = subprocess.run(["git", "-c", "core.quotePath=false", *args], cwd=cwd,
+                              capture_output=True, text=True)
+    except FileNotFoundError:
+        raise GitError("git executable not found")
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.strip() or f"git {' '.join(args)} failed")
+    return proc.stdout
+
+
+def _toplevel(target):
+    cwd = target if os.path.isdir(target) else os.path.dirname(os.path.abspath(target))
+    return _git(["rev-parse", "--show-toplevel"], cwd).strip()
+
+
+def changed_files(target, since=None, staged=False):
+    """Map each changed or added file in target's repository to its changed lines.
+
+    Values are lists of inclusive (start, end) line ranges, or None when the
+    whole file counts as changed (new untracked files, binary artifacts).
+    With `staged` the index is compared to HEAD; otherwise the working tree
+    is compared to `since` and untracked files are included. Only the local
+    repository is consulted.
+    """
+    top = _toplevel(target)
+    diff = ["diff", "--no-color", "--no-ext-diff", "--diff-filter=ACMR"]
+    revs = ["--cached", "--"] if staged else [since, "--"]
+
+    changed = {}
+    for rel in _git(diff + ["--name-only", "-z"] + revs, top).split("\0"):
+        if rel:
+            changed[os.path.join(top, rel)] = None
+    if not staged:
+        for rel in _git(["ls-files", "--others", "--exclude-standard", "-z"], top).split("\0"):
+            if rel:
+                changed[os.path.join(top, rel)] = None
+
+    current = None
+    for line in _git(diff + ["-U0"] + revs, top).splitlines():
+        if line.startswith("+++ "):
+            current = os.path.join(top, line[6:]) if line.startswith("+++ b/") else None
+            if current is not None:
+                changed[current] = []
+        elif current is not None and line.startswith("@@"):
+            m = _HUNK.match(line)
+            if m:
+                start, count = int(m.group(1)), int(m.group(2) or 1)
+                if count:
+                    changed[current].append((start, start + count - 1))
+    return changed
+
+
+def unstaged_files(target):
+    """Files in target's repository whose working tree differs from the index.
+
+    The scanner reads the working tree, so staged line ranges only describe
+    what it sees for files that are not also changed outside the index.
+    """
+    top = _toplevel(target)
+    return {os.path.join(top, rel) for rel in _git(["diff", "--name-only", "-z"], top).split("\0") if rel}
+
+
+_MISSING = object()
+
+
+def on_changed_line(finding, changed):
+    # Files outside `changed` have no changed lines; None means every line.
+    ranges = changed.get(os.path.realpath(finding.file), _MISSING)
+    if ranges is _MISSING:
+        return False
+    if ranges is None:
+        return True
+    return any(start <= finding.lineno <= end for start, end in ranges)
@@ -0,0 +1,113 @@
+"""Rank static findings by measured runtime cost from cProfile / pstats data.
+
+Each finding is attributed to its innermost enclosing function (or the
+module body) and joined with that function's pstats entry, so a PY001 in a
+function that ran for ten seconds outranks one that never ran.
+"""
+import ast
+import os
+import pstats
+import shlex
+import sys
+from .engine import FUNCTION_TYPES
+
+MODULE = "<module>"
+
+
+def run_script(command, save=None):
+    """Run `command` ("script.py args...") under cProfile and return its pstats.Stats."""
+    import cProfile
+    import runpy
+    argv = shlex.split(command)
+    profiler = cProfile.Profile()
+    old_argv, old_path = sys.argv, list(sys.path)
+    sys.argv = argv
+    sys.path.insert(0, os.path.dirname(os.path.abspath(argv[0])))
+    try:
+        profiler.runcall(runpy.run_path, argv[0], run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        sys.argv, sys.path[:] = old_argv, old_path
+    if save:
+        profiler.dump_stats(save)
+    return pstats.Stats(profiler)
+
+
+class RuntimeIndex:
+    """(cumulative seconds, calls) per function, keyed by real path, first line and name."""
+
+    def __init__(self, stats):
+        self.total_time = stats.total_tt
+        self.exact = {}
+        self.by_name = {}
+        for (filename, lineno, name), (_cc, calls, _tt, cumtime, _callers) in stats.stats.items():
+            # Builtins are recorded under "~"; exec'd code under "<string>" and friends.
+            if filename == "~" or filename.startswith("<"):
+                continue
+            path = os.path.realpath(filename)
+            self.exact[(path, lineno, name)] = (cumtime, calls)
+            self.by_name.setdefault((path, name), []).append((cumtime, calls))
+
+    def lookup(self, path, lineno, name):
+        hit = self.exact.get((path, lineno, name))
+        if hit is None:
+            # The module body's first line varies by version, and a file edited
+            # since profiling shifts every function: accept an unambiguous name.
+            candidates = self.by_name.get((path, name), ())
+            if len(candidates) == 1:
+                hit = candidates[0]
+        return hit
+
+
+def function_spans(path):
+    """Return [(start, end, name)] for every function in a source file.
+
+    `start` is the first decorator line, which is what code objects (and so
+    pstats) report as the function's first line.
+    """
+    try:
+        with open(path, "rb") as fp:
+            tree = ast.parse(fp.read().decode("utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+        return []
+    spans = []
+    for node in ast.walk(tree):
+        if isinstance(node, FUNCTION_TYPES):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            spans.append((start, node.end_lineno, node.name))
+    return spans
+
+
+def enclosing(spans, lineno):
+    """(first line, name) of the innermost function containing lineno, else the module."""
+    best = (1, MODULE)
+    for start, end, name in spans:
+        if start <= lineno <= end and start >= best[0]:
+            best = (start, name)
+    return best
+
+
+def rank(findings, stats):
+    """Return finding dicts with measured cost added, most expensive first.
+
+    Adds "function", "cumtime" (seconds spent in that function including its
+    callees) and "calls". Findings in code that never ran get 0 for both and
+    keep their static order by weight.
+    """
+    index = stats if isinstance(stats, RuntimeIndex) else RuntimeIndex(stats)
+    spans = {}
+    ranked = []
+    for f in findings:
+        path = os.path.realpath(f.file)
+        if path not in spans:
+            spans[path] = function_spans(path)
+        start, name = enclosing(spans[path], f.lineno)
+        cumtime, calls = index.lookup(path, start, name) or (0.0, 0)
+        item = f.to_dict()
+        item["function"] = name
+        item["cumtime"] = round(cumtime, 6)
+        item["calls"] = calls
+        ranked.append(item)
+    ranked.sort(key=lambda item: (-item["cumtime"], -item["weight"]))
+    return ranked
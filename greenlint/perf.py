@@ -0,0 +1,137 @@
+import heapq
+from contextlib import nullcontext
+from time import perf_counter
+
+HOOK_GROUP = "greenlint.perf_hooks"
+_hooks = []
+
+
+def add_hook(hook):
+    """Register hook(stats) to be called with the stats of every profiled scan."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def entry_points(group):
+    from importlib.metadata import entry_points as _entry_points
+    eps = _entry_points()
+    # Python 3.9 returns a dict of groups; 3.10+ supports select().
+    return eps.select(group=group) if hasattr(eps, "select") else eps.get(group, [])
+
+
+def load_hooks():
+    """Register hooks published by installed packages under greenlint.perf_hooks."""
+    for ep in entry_points(HOOK_GROUP):
+        hook = ep.load()
+        if hook not in _hooks:
+            add_hook(hook)
+
+
+_NULL = nullcontext()
+
+
+def no_phase(name):
+    return _NULL
+
+
+class _Phase:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats[0] += perf_counter() - self.start
+        self.stats[1] += 1
+
+
+class Profiler:
+    """Wall time and call counts per scan phase and per rule, plus the slowest files.
+
+    Scanning code only touches a Profiler when one is passed in, so a normal
+    run pays for nothing but a few `is None` checks.
+    """
+
+    def __init__(self, top=10):
+        self.top = top
+        self.phases = {}
+        self.rules = {}
+        self.files = []
+        self.dispatchers = {}
+
+    def _stats(self, table, name):
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = [0.0, 0]
+        return stats
+
+    def phase(self, name):
+        return _Phase(self._stats(self.phases, name))
+
+    def add_phase(self, name, seconds, calls=1):
+        stats = self._stats(self.phases, name)
+        stats[0] += seconds
+        stats[1] += calls
+
+    def wrap_rule(self, rule_id, visit):
+        stats = self._stats(self.rules, rule_id)
+
+        def timed(node, ctx):
+            start = perf_counter()
+            visit(node, ctx)
+            stats[0] += perf_counter() - start
+            stats[1] += 1
+        return timed
+
+    def add_file(self, path, seconds):
+        if len(self.files) < self.top:
+            heapq.heappush(self.files, (seconds, path))
+        elif seconds > self.files[0][0]:
+            heapq.heapreplace(self.files, (seconds, path))
+
+    def merge(self, stats):
+        """Fold in the as_dict() output of another profiler (e.g. a worker's)."""
+        for name, s in stats["phases"].items():
+            self.add_phase(name, s["seconds"], s["calls"])
+        for rule_id, s in stats["rules"].items():
+            entry = self._stats(self.rules, rule_id)
+            entry[0] += s["seconds"]
+            entry[1] += s["calls"]
+        for f in stats["slowest_files"]:
+            self.add_file(f["file"], f["seconds"])
+
+    def as_dict(self):
+        return {
+            "phases": {k: {"seconds": v[0], "calls": v[1]} for k, v in self.phases.items()},
+            "rules": {k: {"seconds": v[0], "calls": v[1]} for k, v in sorted(self.rules.items())},
+            "slowest_files": [{"file": p, "seconds": s} for s, p in sorted(self.files, reverse=True)],
+        }
+
+    def finish(self):
+        """Return the collected stats after handing them to every registered hook."""
+        stats = self.as_dict()
+        for hook in list(_hooks):
+            hook(stats)
+        return stats
+
+
+def format_table(stats):
+    lines = [f"{'phase':<16}{'seconds':>10}{'calls':>10}"]
+    for name, s in stats["phases"].items():
+        lines.append(f"{name:<16}{s['seconds']:>10.3f}{s['calls']:>10}")
+    lines.append("")
+    lines.append(f"{'rule':<16}{'seconds':>10}{'calls':>10}")
+    for name, s in sorted(stats["rules"].items(), key=lambda kv: -kv[1]["seconds"]):
+        lines.append(f"{name:<16}{s['seconds']:>10.3f}{s['calls']:>10}")
+    if stats["slowest_files"]:
+        lines.append("")
+        lines.append("slowest files:")
+        for f in stats["slowest_files"]:
+            lines.append(f"  {f['seconds']:>8.3f}s  {f['file']}")
+    return "\n".join(lines)
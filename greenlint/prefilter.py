@@ -0,0 +1,63 @@
+import re
+
+# Loop rules only fire under a `for`, so they also need this keyword.
+LOOP_TRIGGER = b"for"
+
+
+def _pattern(trigger):
+    if isinstance(trigger, bytes):
+        return re.escape(trigger)
+    return trigger.pattern
+
+
+class Prefilter:
+    """Decides from the raw bytes which rules could possibly fire on a file.
+
+    Each rule lists `triggers`: byte strings or compiled bytes regexes, at
+    least one of which must occur in any file the rule can report on. All
+    triggers are folded into one regex so a file is scanned once. Rules
+    without triggers are always run.
+
+    Identifiers are NFKC-normalised by the parser, so a non-ASCII file could
+    spell a name without its ASCII bytes; such files run every rule.
+    """
+
+    def __init__(self, rules):
+        self.rules = [r for r in rules if r.node_types]
+        groups = []
+        self.needs = []
+        for rule in self.rules:
+            names = []
+            for trigger in rule.triggers:
+                names.append(f"t{len(groups)}")
+                groups.append(f"(?P<{names[-1]}>{_pattern(trigger).decode('ascii')})")
+            self.needs.append((rule, frozenset(names), rule.in_loop))
+        groups.append(f"(?P<loop>{re.escape(LOOP_TRIGGER).decode('ascii')})")
+        groups.append("(?P<def>def)")
+        self.regex = re.compile("|".join(groups).encode("ascii"))
+        self.wanted = len(groups)
+
+    def scan(self, data):
+        """Return the set of trigger groups present in `data`, or None for "all"."""
+        if not data.isascii():
+            return None
+        found = set()
+        for m in self.regex.finditer(data):
+            found.add(m.lastgroup)
+            if len(found) == self.wanted:
+                break
+        return found
+
+    def select(self, data, found=False):
+        """Return the tuple of rules that may match `data` (or a prior scan() result)."""
+        if found is False:
+            found = self.scan(data)
+        if found is None:
+            return tuple(self.rules)
+        return tuple(rule for rule, names, in_loop in self.needs
+                     if (not names or names & found) and (not in_loop or "loop" in found))
+
+    @staticmethod
+    def indexable(found):
+        """Whether a file with these scan() groups can define or call project helpers."""
+        return found is None or "def" in found or "loop" in found
@@ -0,0 +1,126 @@
+"""Which rules exist, and loading them on demand.
+
+Besides the built-in rules, installed rule packs publish one entry point
+per rule in the "greenlint.rules" group, named by the rule id and pointing
+at the rule class:
+
+    [project.entry-points."greenlint.rules"]
+    CT001 = "greenlint_carbon.rules:IdleContainer"
+
+Listing and selecting rules only reads entry point names. A pack's module is
+imported the first time one of its rules is loaded, which for parallel
+scans happens in the worker processes that run it.
+"""
+import os
+import sys
+from importlib import import_module
+
+GROUP = "greenlint.rules"
+# Ids of the rules defined in greenlint.rules (see RULES_BY_ID there).
+BUILTIN = ("PY001", "PY002", "PY003", "AI001", "AI002", "PD001", "IO001")
+
+_available = None
+
+
+def _entry_points(group):
+    # Yield (name, value, version) from the entry_points.txt of every
+    # distribution on sys.path. importlib.metadata does the same but takes
+    # longer to import than a whole single-file scan.
+    seen = set()
+    for base in sys.path:
+        try:
+            names = sorted(os.listdir(base or "."))
+        except OSError:
+            continue
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext not in (".dist-info", ".egg-info"):
+                continue
+            project, _, version = stem.partition("-")
+            # The first distribution of a project on sys.path wins, as on import.
+            project = project.lower().replace("_", "-")
+            if project in seen:
+                continue
+            seen.add(project)
+            try:
+                with open(os.path.join(base or ".", name, "entry_points.txt"), encoding="utf-8") as fp:
+                    lines = fp.read().splitlines()
+            except OSError:
+                continue
+            section = None
+            for line in lines:
+                line = line.strip()
+                if line.startswith("["):
+                    section = line.strip("[]").strip()
+                elif section == group and "=" in line and not line.startswith(("#", ";")):
+                    key, _, value = line.partition("=")
+                    # Drop any "[extra]" suffix: "pkg.mod:Rule [fast]".
+                    yield key.strip(), value.split("[")[0].strip(), version or None
+
+
+def available():
+    """{rule id: (entry point value, distribution version)}; both None for built-ins."""
+    global _available
+    if _available is None:
+        found = {}
+        for name, value, version in _entry_points(GROUP):
+            found.setdefault(name, (value, version))
+        # A pack cannot replace a built-in rule.
+        found.update((rule_id, (None, None)) for rule_id in BUILTIN)
+        _available = found
+    return _available
+
+
+def _split(values):
+    # ["PY,AI001", "IO"] -> ("PY", "AI001", "IO")
+    return tuple(p.strip() for value in values or () for p in value.split(",") if p.strip())
+
+
+def select(select=None, ignore=None):
+    """Sorted ids of the rules starting with a `select` prefix (any, if none
+    given) and with no `ignore` prefix. Prefixes may be comma-separated.
+
+    Raises KeyError for a select prefix that matches no known rule.
+    """
+    select, ignore = _split(select), _split(ignore)
+    ids = sorted(available())
+    for prefix in select:
+        if not any(rule_id.startswith(prefix) for rule_id in ids):
+            raise KeyError(prefix)
+    return tuple(rule_id for rule_id in ids
+                 if (not select or rule_id.startswith(select)) and not (ignore and rule_id.startswith(ignore)))
+
+
+def load(rule_id):
+    """The rule instance for `rule_id`, importing its pack on first use; None if unknown."""
+    from .rules import RULES_BY_ID
+    rule = RULES_BY_ID.get(rule_id)
+    if rule is not None:
+        return rule
+    value = available().get(rule_id, (None,))[0]
+    if value is None:
+        return None
+    module, _, attr = value.partition(":")
+    obj = import_module(module)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    rule = obj()
+    if rule.id != rule_id:
+        raise ValueError(f"entry point {rule_id} = {value} defines rule {rule.id}")
+    RULES_BY_ID[rule_id] = rule
+    return rule
+
+
+def load_rules(ids):
+    return tuple(load(rule_id) for rule_id in ids)
+
+
+def salt(ids):
+    """Cache key parts for a rule selection: pack rules carry their version,
+    so upgrading a pack invalidates results computed with the old one."""
+    table = available()
+    out = []
+    for rule_id in ids:
+        value, version = table.get(rule_id, (None, None))
+        out.append(rule_id if value is None else f"{rule_id}={value}@{version}")
+    return out
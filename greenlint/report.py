@@ -1,14 +1,198 @@
 
+import json
 from collections import Counter
+from .rules import SEVERITY_WEIGHTS
 
-def summarise(findings):
-    counts = Counter(f.rule_id for f in findings)
-    total = len(findings)
-    score = max(0, 100 - total * 2)
-    by_severity = Counter(f.severity for f in findings)
-    return {
-        "total_findings": total,
-        "score": score,
-        "by_rule": dict(counts),
-        "by_severity": dict(by_severity),
+# Weighted cost per thousand lines of code at which the score halves.
+SCORE_SCALE = 20
+
+class Summary:
+    """Incrementally aggregated report summary; feed findings as they stream.
+
+    The score is based on the summed finding weights (see rules.cost_weight)
+    per thousand lines scanned, so it tracks hotspots rather than raw counts
+    and never bottoms out on a large tree.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.weight = 0.0
+        self.lines = 0
+        self.by_rule = Counter()
+        self.by_severity = Counter()
+
+    def count(self, rule_id, severity, weight=None):
+        self.total += 1
+        self.weight += SEVERITY_WEIGHTS.get(severity, 2) if weight is None else weight
+        self.by_rule[rule_id] += 1
+        self.by_severity[severity] += 1
+
+    def add(self, finding):
+        self.count(finding.rule_id, finding.severity, finding.weight)
+
+    def add_lines(self, lines):
+        self.lines += lines
+
+    def as_dict(self):
+        density = self.weight / max(self.lines / 1000, 1)
+        return {
+            "total_findings": self.total,
+            "score": round(100 / (1 + density / SCORE_SCALE)),
+            "weighted_cost": round(self.weight, 2),
+            "lines_of_code": self.lines,
+            "by_rule": dict(self.by_rule),
+            "by_severity": dict(self.by_severity),
+        }
+
+def summarise(findings, lines_of_code=0):
+    summary = Summary()
+    summary.add_lines(lines_of_code)
+    for f in findings:
+        summary.add(f)
+    return summary.as_dict()
+
+# --- Streaming report reader ---
+
+FINDINGS_KEYS = ("findings", "results")
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+class _Reader:
+    def __init__(self, fp, chunk_size=1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Malformed report: expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # A number running into the end of the buffer may be truncated.
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+def iter_report(fp):
+    """Yield (key, value) for each top-level entry of a JSON report.
+
+    The findings array is streamed one ("finding", item) pair at a time, so
+    arbitrarily large reports can be read with bounded memory.
+    """
+    r = _Reader(fp)
+    r.expect("{")
+    if r.peek() == "}":
+        return
+    while True:
+        key = r.value()
+        r.expect(":")
+        if key in FINDINGS_KEYS and r.peek() == "[":
+            r.expect("[")
+            if r.peek() == "]":
+                r.pos += 1
+            else:
+                while True:
+                    yield "finding", r.value()
+                    if r.peek() == ",":
+                        r.pos += 1
+                        continue
+                    r.expect("]")
+                    break
+        else:
+            yield key, r.value()
+        if r.peek() == ",":
+            r.pos += 1
+            continue
+        r.expect("}")
+        return
+
+def merge_reports(paths, writer):
+    """Stream the findings of several JSON reports into writer and return
+    the recomputed summary."""
+    summary = Summary()
+    for path in paths:
+        with open(path, encoding="utf-8") as fp:
+            for key, item in iter_report(fp):
+                if key == "summary":
+                    summary.add_lines(item.get("lines_of_code", 0))
+                if key != "finding":
+                    continue
+                summary.count(item.get("rule") or item.get("rule_id", "UNKNOWN"),
+                              item.get("severity", "MEDIUM"), item.get("weight"))
+                writer.write(item)
+    result = summary.as_dict()
+    writer.close(result)
+    return result
+
+# Columns of the dashboard's findings frame. function/cumtime/calls are only
+# present in `greenlint profile` reports.
+FRAME_COLUMNS = ("file", "line", "rule", "message", "severity", "weight", "function", "cumtime", "calls")
+FRAME_DEFAULTS = {"file": "", "line": 0, "rule": "UNKNOWN", "message": "", "severity": "MEDIUM"}
+
+def load_frame(data, name_hint):
+    """(pandas findings frame, summary row) for the bytes of a JSON, Arrow or Parquet report.
+
+    Needs pandas (and pyarrow for columnar reports). Text columns of columnar
+    reports stay categorical, straight from their dictionaries.
+    """
+    import pandas as pd
+    from .writers import ARROW_MAGIC, PARQUET_MAGIC, read_columnar
+    if data.startswith(ARROW_MAGIC) or data.startswith(PARQUET_MAGIC):
+        table, meta = read_columnar(data)
+        frame = table.to_pandas()
+        summary = meta.get("summary", {})
+    else:
+        doc = json.loads(data)
+        # tolerate slightly different schemas
+        findings = doc.get("findings", doc.get("results", []))
+        summary = doc.get("summary", {})
+        frame = pd.DataFrame(findings)
+        if "rule" not in frame and "rule_id" in frame:
+            frame = frame.rename(columns={"rule_id": "rule"})
+    for col in FRAME_COLUMNS:
+        default = FRAME_DEFAULTS.get(col)
+        if col not in frame:
+            frame[col] = default
+        elif default is not None and frame[col].isna().any():
+            values = frame[col]
+            # A categorical only accepts fill values that are already categories.
+            if isinstance(values.dtype, pd.CategoricalDtype) and default not in values.cat.categories:
+                values = values.cat.add_categories([default])
+            frame[col] = values.fillna(default)
+    frame = frame[list(FRAME_COLUMNS)]
+    frame.insert(0, "report", name_hint)
+    row = {
+        "report": name_hint,
+        "total_findings": summary.get("total_findings", len(frame)),
+        "score": summary.get("score", None),
     }
+    return frame, row
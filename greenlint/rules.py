@@ -1,13 +1,70 @@
 
 import ast
+import math
+import re
+from .engine import Dispatcher
+
+# --- Cost model ---
+# A finding's weight is its rule's base severity, scaled by what the flagged
+# code spends (CPU, disk or network) and by how often it is estimated to run.
+SEVERITY_WEIGHTS = {"LOW": 1, "MEDIUM": 2, "HIGH": 4}
+COST_FACTORS = {"cpu": 1, "disk": 2, "network": 4}
+# Minimum weight for each effective severity, highest first.
+SEVERITY_THRESHOLDS = ((12, "HIGH"), (2, "MEDIUM"))
+
+def cost_weight(severity, kind, iterations=1):
+    # Logarithmic in the trip count: static estimates are too rough to take
+    # literally, but each level of nesting should still count for more.
+    return (SEVERITY_WEIGHTS.get(severity, 2) * COST_FACTORS.get(kind, 1)
+            * (1 + math.log10(max(iterations, 1))))
+
+def weighted_severity(weight):
+    for threshold, severity in SEVERITY_THRESHOLDS:
+        if weight >= threshold:
+            return severity
+    return "LOW"
 
 class Finding:
-    def __init__(self, file, lineno, rule_id, message, severity="MEDIUM"):
+    # Findings can number in the millions, so keep them small: no __dict__,
+    # the file path string is shared by every finding of a file, and message
+    # and severity are looked up from the rule table unless overridden.
+    # depth and iterations are the loop nesting and estimated trip count of
+    # the flagged code (see engine.Context.iterations).
+    __slots__ = ("file", "lineno", "rule_id", "_message", "_severity", "depth", "iterations")
+
+    def __init__(self, file, lineno, rule_id, message=None, severity=None, depth=0, iterations=1):
         self.file = file
         self.lineno = lineno
         self.rule_id = rule_id
-        self.message = message
-        self.severity = severity
+        self.depth = depth
+        self.iterations = iterations
+        self._severity = None
+        rule = rule_by_id(rule_id)
+        if rule is not None and message == rule.message:
+            message = None
+        self._message = message
+        if severity is not None and severity != self.severity:
+            self._severity = severity
+
+    @property
+    def weight(self):
+        rule = rule_by_id(self.rule_id)
+        if rule is None:
+            return cost_weight("MEDIUM", "cpu", self.iterations)
+        return cost_weight(rule.severity, rule.cost_kind, self.iterations)
+
+    @property
+    def message(self):
+        if self._message is not None:
+            return self._message
+        rule = rule_by_id(self.rule_id)
+        return rule.message if rule is not None else ""
+
+    @property
+    def severity(self):
+        if self._severity is not None:
+            return self._severity
+        return weighted_severity(self.weight)
 
     def to_dict(self):
         return {
@@ -16,74 +73,103 @@ class Finding:
             "rule": self.rule_id,
             "message": self.message,
             "severity": self.severity,
+            "depth": self.depth,
+            "iterations": self.iterations,
+            "weight": round(self.weight, 2),
         }
 
 class RuleBase:
     id = "GEN000"
     description = "Generic rule"
     severity = "MEDIUM"
+    # What the flagged code mostly spends: "cpu", "disk" or "network".
+    cost_kind = "cpu"
+    message = ""
+    # AST node classes this rule wants to see, and whether only under a loop.
+    node_types = ()
+    in_loop = False
+    # Byte strings / compiled bytes regexes, one of which must appear in any
+    # file this rule can report on (see prefilter.Prefilter). Empty: always run.
+    triggers = ()
+
+    def visit(self, node, ctx):
+        pass
+
+    def report(self, ctx, node, message=None):
+        # Leave message unset to use the rule's default text.
+        ctx.findings.append(Finding(ctx.file_path, node.lineno, self.id, message,
+                                    depth=ctx.loop_depth, iterations=ctx.iterations()))
 
     def check(self, file_path, tree):
-        return []
+        # Compatibility shim: run just this rule through the single-pass dispatcher.
+        return Dispatcher([self]).run(file_path, tree)
+
+def call_name(func):
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return f"{func.value.id}.{func.attr}"
+    return None
 
 class InefficientMembershipCheck(RuleBase):
     id = "PY001"
     description = "Use set for membership checks in loops"
+    message = "Membership test inside loop; consider using a set for O(1) lookups."
+    node_types = (ast.Compare,)
+    in_loop = True
+    triggers = (b"in",)
 
-    def check(self, file_path, tree):
-        findings = []
-        class Visitor(ast.NodeVisitor):
-            def visit_For(self, node):
-                for n in ast.walk(node):
-                    if isinstance(n, ast.Compare) and any(isinstance(op, ast.In) for op in n.ops):
-                        findings.append(Finding(file_path, n.lineno, "PY001",
-                            "Membership test inside loop; consider using a set for O(1) lookups."))
-                self.generic_visit(node)
-        Visitor().visit(tree)
-        return findings
+    # Kinds whose `in` is a linear scan (see symbols.SymbolTable).
+    linear_kinds = {"list", "tuple", "values"}
+    # `x in (a, b)` is idiomatic and cheap; only longer displays are worth a set.
+    small_literal = 8
+
+    def visit(self, node, ctx):
+        for op, container in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)) and self.linear_scan(container, ctx):
+                self.report(ctx, node)
+                return
+
+    def linear_scan(self, expr, ctx):
+        if isinstance(expr, ast.Name):
+            # Only worth hoisting into a set if the loop doesn't rebind it.
+            table = ctx.symbols
+            if table.kind(expr.id) not in self.linear_kinds or table.rebound_in(expr.id, ctx.loops[-1]):
+                return False
+            # A name bound to a short display is as cheap as writing it inline.
+            size = table.size(expr.id)
+            return size is None or size > self.small_literal
+        if isinstance(expr, (ast.List, ast.Tuple)):
+            return len(expr.elts) > self.small_literal
+        # list(...), sorted(...), comprehensions and the like, rebuilt on every pass.
+        return ctx.symbols.infer(expr) in self.linear_kinds
 
 class UnbatchedRequests(RuleBase):
     id = "PY002"
     description = "Potential unbatched network requests in loop"
+    message = "Network calls inside loops; batch or parallelise to reduce time/energy."
+    # For loops that reach a network call through a project helper (see callgraph).
+    indirect_message = "Loop calls {call}(), which makes network requests via {sink}; batch or parallelise."
+    node_types = (ast.Call,)
+    in_loop = True
+    cost_kind = "network"
+    network_calls = {"requests.get", "requests.post", "requests.put", "requests.delete"}
+    triggers = (b"requests",)
 
-    def check(self, file_path, tree):
-        findings = []
-        network_calls = {"requests.get", "requests.post", "requests.put", "requests.delete"}
-        class Visitor(ast.NodeVisitor):
-            def visit_For(self, node):
-                for n in ast.walk(node):
-                    if isinstance(n, ast.Call):
-                        func = n.func
-                        name = None
-                        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
-                            name = f"{func.value.id}.{func.attr}"
-                        if name in network_calls:
-                            findings.append(Finding(file_path, n.lineno, "PY002",
-                                "Network calls inside loops; batch or parallelise to reduce time/energy."))
-                self.generic_visit(node)
-        Visitor().visit(tree)
-        return findings
+    def visit(self, node, ctx):
+        if call_name(node.func) in self.network_calls:
+            self.report(ctx, node)
 
 class ExcessiveLogging(RuleBase):
     id = "PY003"
     description = "Excessive string formatting in logging calls"
+    message = "Use lazy logging (e.g., logging.debug('x=%s', x)) to avoid unnecessary string ops."
+    node_types = (ast.Call,)
+    log_funcs = {"logging.debug", "logging.info"}
+    triggers = (b"logging",)
 
-    def check(self, file_path, tree):
-        findings = []
-        log_funcs = {"logging.debug", "logging.info"}
-        class Visitor(ast.NodeVisitor):
-            def visit_Call(self, node):
-                func = node.func
-                name = None
-                if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
-                    name = f"{func.value.id}.{func.attr}"
-                if name in log_funcs and node.args:
-                    if isinstance(node.args[0], (ast.JoinedStr, ast.Call)):
-                        findings.append(Finding(file_path, node.lineno, "PY003",
-                            "Use lazy logging (e.g., logging.debug('x=%s', x)) to avoid unnecessary string ops."))
-                self.generic_visit(node)
-        Visitor().visit(tree)
-        return findings
+    def visit(self, node, ctx):
+        if call_name(node.func) in self.log_funcs and node.args:
+            if isinstance(node.args[0], (ast.JoinedStr, ast.Call)):
+                self.report(ctx, node)
 
 # === AI Sustainability Rules ===
 
@@ -92,110 +178,87 @@ import os
 class LargeModelFile(RuleBase):
     id = "AI001"
     description = "Model file exceeds recommended sustainable size (>500MB)"
+    message = "Model file exceeds 500MB — consider pruning or quantizing to reduce footprint."
+    extensions = (".pt", ".pth", ".h5", ".onnx", ".joblib", ".pickle")
+    max_mb = 500
+    cost_kind = "disk"
 
-    def check(self, file_path, tree=None):
+    def check_size(self, file_path, size):
+        # Only needs the size from a stat call; the artifact is never read.
         findings = []
-        if file_path.endswith((".pt", ".pth", ".h5", ".onnx", ".joblib", ".pickle")):
-            size_mb = os.path.getsize(file_path) / (1024 * 1024)
-            if size_mb > 500:
-                findings.append(Finding(
-                    file_path,
-                    0,
-                    self.id,
-                    f"Model file size {size_mb:.1f}MB — consider pruning or quantizing to reduce footprint."
-                ))
+        size_mb = size / (1024 * 1024)
+        if size_mb > self.max_mb:
+            findings.append(Finding(
+                file_path,
+                0,
+                self.id,
+                f"Model file size {size_mb:.1f}MB — consider pruning or quantizing to reduce footprint."
+            ))
         return findings
 
+    def check(self, file_path, tree=None):
+        if file_path.endswith(self.extensions):
+            return self.check_size(file_path, os.path.getsize(file_path))
+        return []
+
 
 class TrainFromScratch(RuleBase):
     id = "AI002"
     description = "Training model from scratch — consider transfer learning or fine-tuning pre-trained models"
+    message = "Detected model training call — check if using pre-trained weights to reduce compute."
+    node_types = (ast.Call,)
+    # The attribute name is lower-cased before matching, so match any case.
+    triggers = (re.compile(rb"(?i:fit|train)"),)
 
-    def check(self, file_path, tree):
-        findings = []
-        class Visitor(ast.NodeVisitor):
-            def visit_Call(self, node):
-                if isinstance(node.func, ast.Attribute):
-                    name = node.func.attr.lower()
-                    if name in {"fit", "train"}:
-                        findings.append(Finding(
-                            file_path,
-                            node.lineno,
-                            "AI002",
-                            "Detected model training call — check if using pre-trained weights to reduce compute."
-                        ))
-                self.generic_visit(node)
-        Visitor().visit(tree)
-        return findings
+    def visit(self, node, ctx):
+        if isinstance(node.func, ast.Attribute):
+            name = node.func.attr.lower()
+            if name in {"fit", "train"}:
+                self.report(ctx, node)
     
 class PandasRowWiseOps(RuleBase):
     id = "PD001"
     description = "Row-wise pandas operations detected; prefer vectorisation"
+    message = "pandas apply(axis=1) is slow; prefer vectorised ops."
+    iterrows_message = "pandas iterrows() is slow; prefer vectorised ops."
+    node_types = (ast.Call,)
+    triggers = (b"apply", b"iterrows")
 
-    def check(self, file_path, tree):
-        findings = []
-        rule_id = self.id  # capture for inner class
-
-        class V(ast.NodeVisitor):
-            def visit_Call(self, node):
-                # df.apply(..., axis=1) or df.iterrows()
-                if isinstance(node.func, ast.Attribute):
-                    attr = node.func.attr
-
-                    # df.apply(..., axis=1)
-                    if attr == "apply":
-                        for kw in (node.keywords or []):
-                            try:
-                                if kw.arg == "axis" and getattr(kw.value, "value", None) == 1:
-                                    findings.append(Finding(
-                                        file_path, node.lineno, rule_id,
-                                        "pandas apply(axis=1) is slow; prefer vectorised ops."
-                                    ))
-                            except Exception:
-                                pass
-
-                    # df.iterrows()
-                    if attr == "iterrows":
-                        findings.append(Finding(
-                            file_path, node.lineno, rule_id,
-                            "pandas iterrows() is slow; prefer vectorised ops."
-                        ))
-                self.generic_visit(node)
-
-        V().visit(tree)
-        return findings
+    def visit(self, node, ctx):
+        # df.apply(..., axis=1) or df.iterrows()
+        if isinstance(node.func, ast.Attribute):
+            attr = node.func.attr
+
+            # df.apply(..., axis=1)
+            if attr == "apply":
+                for kw in (node.keywords or []):
+                    if kw.arg == "axis" and getattr(kw.value, "value", None) == 1:
+                        self.report(ctx, node)
+
+            # df.iterrows()
+            if attr == "iterrows":
+                self.report(ctx, node, self.iterrows_message)
 
 
 class LargeFileIoInLoop(RuleBase):
     id = "IO001"
     description = "Potential large file I/O inside loop; use chunking/buffering"
+    message = "File I/O called inside loop; consider chunked reads or preloading."
+    indirect_message = "Loop calls {call}(), which does file I/O via {sink}; consider chunked reads or preloading."
+    node_types = (ast.Call,)
+    in_loop = True
+    cost_kind = "disk"
+    suspicious_funcs = {"read_csv", "read_json", "open"}
+    triggers = (b"read_csv", b"read_json", b"open")
 
-    def check(self, file_path, tree):
-        findings = []
-        rule_id = self.id  # capture for inner class
-        suspicious_funcs = {"read_csv", "read_json", "open"}
-
-        class V(ast.NodeVisitor):
-            def visit_For(self, node):
-                for n in ast.walk(node):
-                    if isinstance(n, ast.Call):
-                        name = None
-                        try:
-                            if isinstance(n.func, ast.Attribute):
-                                name = n.func.attr
-                            elif isinstance(n.func, ast.Name):
-                                name = n.func.id
-                            if name in suspicious_funcs:
-                                findings.append(Finding(
-                                    file_path, getattr(n, "lineno", getattr(node, "lineno", 0)), rule_id,
-                                    "File I/O called inside loop; consider chunked reads or preloading."
-                                ))
-                        except Exception:
-                            pass
-                self.generic_visit(node)
-
-        V().visit(tree)
-        return findings
+    def visit(self, node, ctx):
+        name = None
+        if isinstance(node.func, ast.Attribute):
+            name = node.func.attr
+        elif isinstance(node.func, ast.Name):
+            name = node.func.id
+        if name in self.suspicious_funcs:
+            self.report(ctx, node)
 
 
 
@@ -208,3 +271,23 @@ ALL_RULES = [
     PandasRowWiseOps(),
     LargeFileIoInLoop()
 ]
+
+RULES_BY_ID = {rule.id: rule for rule in ALL_RULES}
+
+
+def rule_by_id(rule_id):
+    rule = RULES_BY_ID.get(rule_id)
+    if rule is None:
+        # A rule-pack finding built in the parent process, where the pack
+        # was not needed so far; registry.load() adds it to RULES_BY_ID.
+        from .registry import load
+        rule = load(rule_id)
+    return rule
+
+
+def check_only(rules):
+    # Rules written against the older whole-tree check(file_path, tree) API
+    # declare no node_types, so the dispatcher skips them; callers run them
+    # per tree. Model artifacts are checked by size instead.
+    return tuple(r for r in rules if not r.node_types and type(r).check is not RuleBase.check
+                 and not isinstance(r, LargeModelFile))
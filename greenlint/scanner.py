@@ -1,18 +1,277 @@
 
 import ast
-from pathlib import Path
-from .rules import ALL_RULES
-
-def scan_path(path):
-    path = Path(path)
-    files = list(path.rglob("*.py")) if path.is_dir() else [path]
-    findings = []
-    for f in files:
+import hashlib
+import os
+import sys
+from collections import deque
+from functools import partial
+from itertools import chain, islice
+from time import perf_counter
+from .discovery import DEFAULT_EXCLUDES, iter_files, iter_paths
+from .callgraph import COLLECTOR, collect_facts, digest, trim_facts
+from .engine import Dispatcher
+from .perf import Profiler, no_phase
+from .prefilter import Prefilter
+from .registry import load_rules, salt, select
+from .rules import Finding, LargeModelFile, check_only
+
+# Work item size for a source file outside the shard that is only read for
+# its call-graph facts (see discover).
+FACTS_ONLY = -1
+# Files handed to a worker per task; large enough to amortise IPC, small
+# enough that results start streaming back quickly.
+CHUNK_SIZE = 64
+
+_dispatchers = {}
+# Rule id selection -> (rule instances, Prefilter, check-only rules, cache key
+# salt); built on first use in each process, so a worker only imports the
+# rule packs it runs.
+_selections = {}
+_artifact_rule = LargeModelFile()
+
+def _get_selection(rule_ids):
+    selection = _selections.get(rule_ids)
+    if selection is None:
+        rules = load_rules(rule_ids)
+        selection = _selections[rule_ids] = (rules, Prefilter(rules), check_only(rules), salt(rule_ids))
+    return selection
+
+def _get_dispatcher(rules, prof=None):
+    # One dispatcher per distinct subset of rules the prefilter lets through
+    # (plus the call-graph COLLECTOR when indexing). Profiled runs get their
+    # own, with timed rule handlers.
+    cache = prof.dispatchers if prof is not None else _dispatchers
+    key = tuple(r.id for r in rules)
+    dispatcher = cache.get(key)
+    if dispatcher is None:
+        dispatcher = cache[key] = Dispatcher(rules, profiler=prof)
+    return dispatcher
+
+def _rows(findings):
+    # Findings as plain (lineno, rule_id, message, depth, iterations) tuples so
+    # they are cheap to ship between processes and to store in the cache.
+    # message is None unless the rule overrode its default text.
+    return [(f.lineno, f.rule_id, f._message, f.depth, f.iterations) for f in findings]
+
+def _count_lines(data):
+    lines = data.count(b"\n")
+    return lines + 1 if data and not data.endswith(b"\n") else lines
+
+def _scan_file(path, cache=None, prof=None, prefilter=True, index=False, rule_ids=None):
+    # Returns (lines, rows, facts) for one source file. With `index`, facts is
+    # (content digest, call-graph facts or None); otherwise it is None.
+    # `rule_ids` is a tuple of rule ids to run (default: all of them).
+    phase = prof.phase if prof is not None else no_phase
+    try:
+        with phase("read"):
+            with open(path, "rb") as fp:
+                data = fp.read()
+    except OSError:
+        return 0, [], None
+    lines = _count_lines(data)
+    rules, pf, checks, rule_salt = _get_selection(select() if rule_ids is None else rule_ids)
+    if cache is not None:
+        with phase("cache"):
+            key = cache.key(data, rule_salt)
+            entry = cache.get(key)
+        # Entries written without the index lack facts; rescan those.
+        if entry is not None and (not index or "facts" in entry):
+            rows = [tuple(r) for r in entry["rows"]]
+            return lines, rows, (digest(data), entry["facts"]) if index else None
+    if prefilter:
+        with phase("prefilter"):
+            found = pf.scan(data)
+            rules = pf.select(data, found)
+            # Package __init__ files matter for the names they re-export.
+            wants_facts = index and (pf.indexable(found) or path.endswith("__init__.py"))
+    else:
+        wants_facts = index
+    rows = []
+    facts = None
+    if rules or checks or wants_facts:
+        visitors = tuple(rules) + (COLLECTOR,) if wants_facts else rules
         try:
-            code = f.read_text(encoding="utf-8")
-            tree = ast.parse(code)
+            with phase("parse"):
+                tree = ast.parse(data.decode("utf-8"))
         except Exception:
+            pass
+        else:
+            with phase("rules"):
+                ctx = _get_dispatcher(visitors, prof).walk(path, tree)
+                rows = _rows(ctx.findings)
+                for rule in checks:
+                    rows.extend(_rows(rule.check(path, tree)))
+                facts = trim_facts(ctx.facts)
+    if cache is not None:
+        with phase("cache"):
+            cache.put(key, {"rows": rows, "facts": facts} if index else {"rows": rows})
+    return lines, rows, (digest(data), facts) if index else None
+
+def _facts_only(path, prefilter=True, rule_ids=None):
+    # (digest, facts) of a file that is indexed but not scanned. Nothing is
+    # cached: the cache holds rule results, and the index persists facts.
+    try:
+        with open(path, "rb") as fp:
+            data = fp.read()
+    except OSError:
+        return None
+    if prefilter and not path.endswith("__init__.py"):
+        pf = _get_selection(select() if rule_ids is None else rule_ids)[1]
+        if not pf.indexable(pf.scan(data)):
+            return digest(data), None
+    return digest(data), collect_facts(data)
+
+def _scan_item(item, cache=None, prof=None, prefilter=True, index=False, rule_ids=None):
+    path, size = item
+    if size == FACTS_ONLY:
+        # lines is None: the file is indexed, not reported.
+        return path, None, [], _facts_only(path, prefilter, rule_ids)
+    if size is not None:
+        if rule_ids is not None and _artifact_rule.id not in rule_ids:
+            return path, 0, [], None
+        return path, 0, _rows(_artifact_rule.check_size(path, size)), None
+    if prof is None:
+        return (path, *_scan_file(path, cache, None, prefilter, index, rule_ids))
+    start = perf_counter()
+    result = _scan_file(path, cache, prof, prefilter, index, rule_ids)
+    prof.add_file(path, perf_counter() - start)
+    return (path, *result)
+
+def _scan_chunk(items, cache=None, profile=False, prefilter=True, index=False, rule_ids=None):
+    # Worker entry point: returns (results, profiler stats or None).
+    prof = Profiler() if profile else None
+    results = [_scan_item(item, cache, prof, prefilter, index, rule_ids) for item in items]
+    return results, prof.as_dict() if prof is not None else None
+
+def _chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _map_ordered(executor, fn, iterable, window):
+    # Like executor.map, but keeps at most `window` tasks in flight so the
+    # input is consumed lazily and results are yielded in submission order.
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _timed(iterable, prof, name):
+    # Charge the time spent producing each item (e.g. walking the tree) to a phase.
+    it = iter(iterable)
+    while True:
+        start = perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            prof.add_phase(name, perf_counter() - start, 0)
+            return
+        prof.add_phase(name, perf_counter() - start)
+        yield item
+
+def _iter_results(items, jobs, cache, prof=None, prefilter=True, index=False, rule_ids=None):
+    items = iter(items)
+    head = list(islice(items, CHUNK_SIZE + 1))
+    if jobs <= 1 or len(head) <= CHUNK_SIZE:
+        for item in chain(head, items):
+            yield _scan_item(item, cache, prof, prefilter, index, rule_ids)
+        return
+    # Only needed for parallel scans, and slow to import.
+    from concurrent.futures import ProcessPoolExecutor
+    # Workers get rule ids, not rules, and load what they run themselves.
+    scan_chunk = partial(_scan_chunk, cache=cache, profile=prof is not None, prefilter=prefilter, index=index,
+                         rule_ids=rule_ids)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunks = _chunked(chain(head, items), CHUNK_SIZE)
+        for results, stats in _map_ordered(executor, scan_chunk, chunks, jobs * 2):
+            if stats is not None:
+                prof.merge(stats)
+            yield from results
+
+def in_shard(rel_path, shard):
+    # Hash the root-relative POSIX path so every CI agent agrees on the split
+    # regardless of checkout location or OS.
+    index, count = shard
+    digest = hashlib.blake2b(rel_path.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count == index - 1
+
+def discover(path, exclude=None, use_gitignore=True, shard=None, files=None, index_all=False):
+    # Generator of (path, size) work items; size is set only for model artifacts.
+    # `files` restricts the scan to an explicit list of paths under `path`.
+    # With `index_all`, source files outside the shard come out with size
+    # FACTS_ONLY, so every shard indexes the whole tree.
+    exclude = DEFAULT_EXCLUDES + tuple(exclude or ())
+    if files is None:
+        found = iter_files(path, exclude, use_gitignore)
+    else:
+        found = iter_paths(path, files, exclude)
+    for file, rel_path, size in found:
+        if shard is None or in_shard(rel_path, shard):
+            yield file, size
+        elif index_all and size is None:
+            yield file, FACTS_ONLY
+
+def iter_file_results(path, jobs=None, cache=None, shard=None, exclude=None, use_gitignore=True, files=None,
+                      profiler=None, prefilter=True, index=None, rules=None):
+    """Yield (file, lines, findings) per scanned file, in deterministic order.
+
+    `lines` is the file's line count (0 for model artifacts), for normalising
+    the score. Pass a perf.Profiler as `profiler` to collect per-phase and
+    per-rule timings. `prefilter=False` parses every file and runs every rule on it.
+
+    Pass a callgraph.ProjectIndex as `index` to also report loops that reach
+    network or file I/O through project functions. Those findings need the
+    whole index, so they follow as extra (file, 0, findings) results at the end.
+
+    With a `shard`, files outside it are still read for the index (but not
+    reported), so helpers defined in another shard resolve.
+
+    `rules` is a sequence of rule ids to run (see registry.select); default all.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    rule_ids = select() if rules is None else tuple(rules)
+    items = discover(path, exclude, use_gitignore, shard, files, index_all=index is not None)
+    if index is not None and shard is not None:
+        # Files already in a persisted index are revalidated by index.refresh.
+        items = (item for item in items if item[1] != FACTS_ONLY or not index.known(item[0]))
+    if profiler is not None:
+        items = _timed(items, profiler, "discover")
+    intern = sys.intern
+    for file, lines, rows, facts in _iter_results(items, jobs, cache, profiler, prefilter, index is not None,
+                                                  rule_ids):
+        if lines is None:
+            if facts is not None:
+                index.update(file, *facts, scanned=False)
             continue
-        for rule in ALL_RULES:
-            findings.extend(rule.check(str(f), tree))
-    return findings
+        if facts is not None:
+            index.update(file, *facts)
+        # Rows arrive as fresh strings from pickling or the cache; intern the
+        # repeated ones so every finding shares a single copy.
+        yield file, lines, [Finding(file, lineno, intern(rule_id), message and intern(message),
+                                    depth=depth, iterations=iterations)
+                            for lineno, rule_id, message, depth, iterations in rows]
+    if index is not None:
+        phase = profiler.phase if profiler is not None else no_phase
+        with phase("index"):
+            index.refresh()
+            results = list(index.findings())
+        wanted = set(rule_ids)
+        for file, findings in results:
+            findings = [f for f in findings if f.rule_id in wanted]
+            if findings:
+                yield file, 0, findings
+
+def iter_findings(path, **kwargs):
+    """Yield findings in deterministic order as files finish scanning (see iter_file_results)."""
+    for _file, _lines, findings in iter_file_results(path, **kwargs):
+        yield from findings
+
+def scan_path(path, **kwargs):
+    return list(iter_findings(path, **kwargs))
@@ -0,0 +1,309 @@
+import ast
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import json
+import os
+import select
+import socketserver
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from . import registry
+from .client import default_socket, request
+from .discovery import DEFAULT_EXCLUDES, iter_dirs, iter_paths
+from .engine import Dispatcher
+from .report import summarise
+from .rules import LargeModelFile, check_only
+from .scanner import discover
+
+DEFAULT_CAPACITY = 4096
+
+
+class Workspace:
+    """Long-lived, thread-safe view of a tree: findings per file.
+
+    Entries live in an LRU keyed by path. A file is only re-read when its
+    stat changes, and only re-parsed when its content hash changes too.
+    `rules` is a sequence of rule ids to run (see registry.select); default all.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, exclude=None, use_gitignore=True, rules=None):
+        self.capacity = capacity
+        self.exclude = exclude
+        self.use_gitignore = use_gitignore
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.rules = registry.load_rules(registry.select() if rules is None else tuple(rules))
+        self.dispatcher = Dispatcher(self.rules)
+        self.checks = check_only(self.rules)
+        self.artifact_rule = next((r for r in self.rules if isinstance(r, LargeModelFile)), None)
+
+    def check(self, path, size=None):
+        if size is not None:
+            return self.artifact_rule.check_size(path, size) if self.artifact_rule is not None else []
+        with self.lock:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.entries.pop(path, None)
+                return []
+            entry = self.entries.get(path)
+            if entry is not None:
+                self.entries.move_to_end(path)
+                if entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                    return entry[3]
+            try:
+                with open(path, "rb") as fp:
+                    data = fp.read()
+            except OSError:
+                return []
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if entry is not None and entry[2] == digest:
+                entry[0], entry[1] = st.st_mtime_ns, st.st_size
+                return entry[3]
+            try:
+                tree = ast.parse(data.decode("utf-8"))
+            except Exception:
+                findings = []
+            else:
+                findings = self.dispatcher.run(path, tree)
+                for rule in self.checks:
+                    findings.extend(rule.check(path, tree))
+            self.entries[path] = [st.st_mtime_ns, st.st_size, digest, findings]
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+            return findings
+
+    def scan(self, target):
+        findings = []
+        for path, size in discover(target, self.exclude, self.use_gitignore):
+            findings.extend(self.check(path, size))
+        return findings
+
+    def forget(self, path):
+        with self.lock:
+            self.entries.pop(path, None)
+
+    def handle(self, request):
+        """Answer one protocol request (a decoded JSON object)."""
+        op = request.get("op", "check")
+        if op == "ping":
+            return {"ok": True}
+        if op == "check":
+            path = request.get("path")
+            if not path or not os.path.exists(path):
+                return {"error": f"no such path: {path!r}"}
+            findings = self.scan(path)
+            return {"findings": [f.to_dict() for f in findings], "summary": summarise(findings)}
+        return {"error": f"unknown op: {op!r}"}
+
+
+def _reply(workspace, line):
+    try:
+        request = json.loads(line)
+        response = workspace.handle(request)
+    except ValueError as e:
+        request, response = {}, {"error": f"bad request: {e}"}
+    if "id" in request:
+        response["id"] = request["id"]
+    return json.dumps(response) + "\n"
+
+
+def serve_stdio(workspace, stdin=None, stdout=None):
+    """Serve newline-delimited JSON requests on stdin until EOF."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if line.strip():
+            stdout.write(_reply(workspace, line))
+            stdout.flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(_reply(self.server.workspace, line).encode("utf-8"))
+                self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_unix(workspace, socket_path=None):
+    """Serve requests on a Unix socket until interrupted.
+
+    Raises OSError(EADDRINUSE) if something already answers on the socket;
+    a socket file left behind by a daemon that died is replaced.
+    """
+    socket_path = socket_path or default_socket()
+    if os.path.exists(socket_path):
+        try:
+            request({"op": "ping"}, socket_path, timeout=1.0)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            raise OSError(errno.EADDRINUSE, f"{socket_path} is in use by another process")
+        else:
+            raise OSError(errno.EADDRINUSE, f"a greenlint daemon is already listening on {socket_path}")
+    with _UnixServer(socket_path, _Handler) as server:
+        server.workspace = workspace
+        os.chmod(socket_path, 0o600)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+# --- watch mode ---
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+
+    def add(self, directory):
+        wd = self._add(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = directory
+
+    def read(self, timeout):
+        """Return [(path, mask)] for events within timeout seconds (may be empty)."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        data = os.read(self.fd, 1 << 16)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            directory = self.dirs.get(wd)
+            if directory is not None:
+                events.append((os.path.join(directory, os.fsdecode(name)), mask))
+            elif mask & IN_Q_OVERFLOW:
+                events.append((None, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _snapshot(workspace, target):
+    snap = {}
+    for path, size in discover(target, workspace.exclude, workspace.use_gitignore):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snap[path] = (st.st_mtime_ns, st.st_size, size)
+    return snap
+
+
+def _changes_from_events(workspace, target, notify, events):
+    # Translate raw inotify events into (changed, removed) without walking the tree.
+    exclude = DEFAULT_EXCLUDES + tuple(workspace.exclude or ())
+    candidates, removed = set(), []
+    for path, mask in events:
+        if path is None:
+            return None
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                for sub in iter_dirs(path, exclude, workspace.use_gitignore):
+                    notify.add(sub)
+                for sub, _size in discover(path, workspace.exclude, workspace.use_gitignore):
+                    candidates.add(sub)
+            else:
+                prefix = path + os.sep
+                removed.extend(p for p in list(workspace.entries) if p.startswith(prefix))
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            removed.append(path)
+        else:
+            candidates.add(path)
+    changed = []
+    for path, _rel, size in iter_paths(target, [p for p in candidates if os.path.exists(p)], exclude):
+        changed.append((path, size))
+    return changed, removed
+
+
+def watch(workspace, target, on_change, interval=1.0, use_inotify=True, stop=None):
+    """Call on_change(findings, removed) whenever scannable files under target change.
+
+    `findings` maps each changed path to its fresh findings. Uses inotify on
+    Linux and falls back to polling stat() every `interval` seconds.
+    """
+    stop = stop or threading.Event()
+    target = os.path.abspath(target)
+    snap = _snapshot(workspace, target)
+    for path, (_m, _s, size) in snap.items():
+        workspace.check(path, size)
+
+    notify = None
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            notify = _Inotify()
+        except (OSError, AttributeError):
+            notify = None
+    if notify is not None:
+        if os.path.isdir(target):
+            # Every directory, not just those holding files yet: a file can
+            # appear later in a directory that is empty now.
+            exclude = DEFAULT_EXCLUDES + tuple(workspace.exclude or ())
+            dirs = iter_dirs(target, exclude, workspace.use_gitignore)
+        else:
+            dirs = [os.path.dirname(target)]
+        for d in dirs:
+            notify.add(d)
+
+    try:
+        while not stop.is_set():
+            changes = None
+            if notify is not None:
+                events = notify.read(interval)
+                if not events:
+                    continue
+                # Let editors finish their write/rename dance before rechecking.
+                time.sleep(0.05)
+                events.extend(notify.read(0))
+                changes = _changes_from_events(workspace, target, notify, events)
+            else:
+                stop.wait(interval)
+            if changes is None:
+                # Polling, or the inotify queue overflowed: diff a fresh snapshot.
+                new = _snapshot(workspace, target)
+                changes = ([(p, v[2]) for p, v in new.items() if snap.get(p) != v],
+                           [p for p in snap if p not in new])
+                snap = new
+            changed, removed = changes
+            if not changed and not removed:
+                continue
+            for path in removed:
+                workspace.forget(path)
+            on_change({path: workspace.check(path, size) for path, size in changed}, removed)
+    finally:
+        if notify is not None:
+            notify.close()
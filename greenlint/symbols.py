@@ -0,0 +1,169 @@
+"""Per-scope symbol tables: what kind of value each local name is bound to.
+
+Tables are built lazily, once per function (or module) and file, the first
+time a rule asks for one through ``Context.symbols``. Kinds are coarse:
+"list", "tuple", "set", "dict", "str", "values" (a dict values view) or
+None when a binding's value cannot be inferred statically.
+"""
+import ast
+
+_SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+_COMPREHENSIONS = {ast.ListComp: "list", ast.SetComp: "set", ast.DictComp: "dict", ast.GeneratorExp: None}
+_DISPLAYS = {ast.List: "list", ast.Tuple: "tuple", ast.Set: "set", ast.Dict: "dict"}
+# List methods that add elements in place.
+_GROWERS = {"append", "extend", "insert"}
+_CONSTRUCTORS = {"list": "list", "sorted": "list", "tuple": "tuple", "set": "set", "frozenset": "set",
+                 "dict": "dict", "str": "str"}
+_METHODS = {"split": "list", "rsplit": "list", "splitlines": "list", "readlines": "list",
+            "keys": "set", "values": "values", "copy": None}
+# Annotation names (bare or subscripted, typing or builtin) that pin a parameter's kind.
+_ANNOTATIONS = {"list": "list", "List": "list", "Sequence": "list", "MutableSequence": "list",
+                "tuple": "tuple", "Tuple": "tuple", "set": "set", "Set": "set", "frozenset": "set",
+                "FrozenSet": "set", "AbstractSet": "set", "dict": "dict", "Dict": "dict", "Mapping": "dict",
+                "MutableMapping": "dict", "str": "str"}
+
+
+def annotation_kind(node):
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    if isinstance(node, ast.Attribute):
+        return _ANNOTATIONS.get(node.attr)
+    if isinstance(node, ast.Name):
+        return _ANNOTATIONS.get(node.id)
+    return None
+
+
+def _display_size(expr):
+    if isinstance(expr, (ast.List, ast.Tuple)) and not any(isinstance(e, ast.Starred) for e in expr.elts):
+        return len(expr.elts)
+    return None
+
+
+class SymbolTable:
+    """Bindings of the names assigned in one function or module scope.
+
+    Each binding is recorded as (kind, loops): the inferred kind of the bound
+    value and the For loops (of this scope) the binding statement sits in.
+    Names a scope does not bind are looked up in the enclosing table.
+    `sizes` holds, per binding, the element count of a list or tuple display
+    it binds (None for any other value).
+    """
+
+    def __init__(self, scope, parent=None):
+        self.scope = scope
+        self.parent = parent
+        self.bindings = {}
+        self.sizes = {}
+        self.declared = set()
+        self._grown = None
+        if isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            args = scope.args
+            for arg in args.posonlyargs + args.args + args.kwonlyargs:
+                self._bind(arg.arg, annotation_kind(arg.annotation), ())
+            if args.vararg:
+                self._bind(args.vararg.arg, "tuple", ())
+            if args.kwarg:
+                self._bind(args.kwarg.arg, "dict", ())
+        for stmt in scope.body:
+            self._visit(stmt, ())
+
+    def _bind(self, name, kind, loops, size=None):
+        self.bindings.setdefault(name, []).append((kind, loops))
+        self.sizes.setdefault(name, []).append(size)
+
+    def _target(self, target, kind, loops, size=None):
+        if isinstance(target, ast.Name):
+            self._bind(target.id, kind, loops, size)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for elt in target.elts:
+                self._target(elt.value if isinstance(elt, ast.Starred) else elt, None, loops)
+
+    def _visit(self, node, loops):
+        if isinstance(node, _SCOPE_TYPES):
+            # Nested scopes get their own table; only their name binds here.
+            if not isinstance(node, ast.Lambda):
+                self._bind(node.name, None, loops)
+            return
+        if type(node) in _COMPREHENSIONS:
+            return
+        if isinstance(node, ast.Assign):
+            kind = self.infer(node.value)
+            for target in node.targets:
+                self._target(target, kind, loops, _display_size(node.value))
+        elif isinstance(node, ast.AnnAssign):
+            kind = annotation_kind(node.annotation)
+            if node.value is not None:
+                kind = self.infer(node.value) or kind
+            self._target(node.target, kind, loops, _display_size(node.value))
+        elif isinstance(node, ast.AugAssign):
+            # xs += [...] keeps a list a list; anything else we cannot tell.
+            same = isinstance(node.op, (ast.Add, ast.BitOr)) and isinstance(node.target, ast.Name)
+            self._target(node.target, self.kind(node.target.id) if same else None, loops)
+        elif isinstance(node, ast.NamedExpr):
+            self._target(node.target, self.infer(node.value), loops)
+        elif isinstance(node, (ast.For, ast.AsyncFor)):
+            loops = loops + (node,)
+            self._target(node.target, None, loops)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                if item.optional_vars is not None:
+                    self._target(item.optional_vars, None, loops)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                self._bind(alias.asname or alias.name.split(".")[0], None, loops)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            self.declared.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            self._bind(node.name, None, loops)
+        for child in ast.iter_child_nodes(node):
+            self._visit(child, loops)
+
+    def kind(self, name):
+        """The kind every binding of `name` agrees on, else None."""
+        if name in self.declared or name not in self.bindings:
+            return self.parent.kind(name) if self.parent is not None else None
+        kinds = {kind for kind, _loops in self.bindings[name]}
+        return kinds.pop() if len(kinds) == 1 else None
+
+    def size(self, name):
+        """Largest list/tuple display `name` is bound to, if every binding is
+        one and no code in this scope (nested ones included) grows it; else None."""
+        if name in self.declared or name not in self.bindings:
+            return self.parent.size(name) if self.parent is not None else None
+        sizes = self.sizes[name]
+        if None in sizes:
+            return None
+        if self._grown is None:
+            self._grown = {node.func.value.id for node in ast.walk(self.scope)
+                           if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                           and node.func.attr in _GROWERS and isinstance(node.func.value, ast.Name)}
+        return None if name in self._grown else max(sizes)
+
+    def rebound_in(self, name, loop):
+        """Whether `name` is (re)bound anywhere inside `loop` in this scope."""
+        return any(loop in loops for _kind, loops in self.bindings.get(name, ()))
+
+    def infer(self, expr):
+        """Kind of the value `expr` evaluates to, or None if unknown."""
+        kind = _DISPLAYS.get(type(expr))
+        if kind is not None:
+            return kind
+        if type(expr) in _COMPREHENSIONS:
+            return _COMPREHENSIONS[type(expr)]
+        if isinstance(expr, ast.Constant):
+            return "str" if isinstance(expr.value, (str, bytes)) else None
+        if isinstance(expr, ast.Name):
+            return self.kind(expr.id)
+        if isinstance(expr, ast.Call):
+            func = expr.func
+            if isinstance(func, ast.Name):
+                return _CONSTRUCTORS.get(func.id)
+            if isinstance(func, ast.Attribute):
+                if func.attr == "copy":
+                    return self.infer(func.value)
+                return _METHODS.get(func.attr)
+            return None
+        if isinstance(expr, ast.BinOp) and isinstance(expr.op, ast.Add):
+            left = self.infer(expr.left)
+            return left if left in ("list", "tuple", "str") else None
+        return None
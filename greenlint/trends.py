@@ -0,0 +1,221 @@
+"""Append-only SQLite store of report summaries across builds.
+
+`greenlint record` adds one row to `builds` per CI run, with the per-rule
+finding counts (and rule timings, for --profile reports) in `rule_counts`.
+The same transaction bumps the per-day rollups in `daily` and
+`daily_rules`, so charts over months of builds read one row per day
+instead of aggregating every build. Per-rule means divide by the day's
+build count in `daily`: a rule with no findings is left out of `by_rule`,
+so counting builds per rule would skip clean builds. Builds are never
+updated or deleted.
+"""
+import json
+import os
+import sqlite3
+import time
+from .gitdiff import GitError, _git
+from .report import iter_report
+from .writers import ARROW_MAGIC, PARQUET_MAGIC
+
+DEFAULT_STORE = "greenlint_trends.db"
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    recorded_at INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    commit_sha TEXT,
+    branch TEXT,
+    report TEXT,
+    total_findings INTEGER NOT NULL,
+    score INTEGER,
+    weighted_cost REAL,
+    lines_of_code INTEGER,
+    duration REAL,
+    perf TEXT
+);
+CREATE INDEX IF NOT EXISTS builds_recorded_at ON builds (recorded_at);
+CREATE INDEX IF NOT EXISTS builds_commit ON builds (commit_sha);
+CREATE TABLE IF NOT EXISTS rule_counts (
+    build_id INTEGER NOT NULL REFERENCES builds (id),
+    rule TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    seconds REAL,
+    PRIMARY KEY (build_id, rule)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rule_counts_rule ON rule_counts (rule, build_id);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT PRIMARY KEY,
+    builds INTEGER NOT NULL,
+    findings INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_builds INTEGER NOT NULL,
+    score_min INTEGER,
+    score_max INTEGER,
+    duration_sum REAL NOT NULL,
+    duration_builds INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_rules (
+    day TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    findings INTEGER NOT NULL,
+    PRIMARY KEY (day, rule)
+) WITHOUT ROWID;
+"""
+# Version 1 also counted builds per rule in daily_rules; rebuild it from rule_counts.
+MIGRATE_V1 = """
+DROP TABLE daily_rules;
+CREATE TABLE daily_rules (
+    day TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    findings INTEGER NOT NULL,
+    PRIMARY KEY (day, rule)
+) WITHOUT ROWID;
+INSERT INTO daily_rules
+    SELECT b.day, r.rule, sum(r.count) FROM rule_counts r JOIN builds b ON b.id = r.build_id GROUP BY b.day, r.rule;
+"""
+# CI variables holding the commit and branch being built, most common first.
+COMMIT_VARS = ("GITHUB_SHA", "BUILD_SOURCEVERSION", "CI_COMMIT_SHA", "GIT_COMMIT")
+BRANCH_VARS = ("GITHUB_REF_NAME", "BUILD_SOURCEBRANCHNAME", "CI_COMMIT_REF_NAME", "GIT_BRANCH")
+
+
+def _from_env(names):
+    for name in names:
+        value = os.environ.get(name)
+        if value:
+            return value
+    return None
+
+
+def build_commit(cwd="."):
+    """(commit, branch) of the build from CI variables, else from git, else None."""
+    commit, branch = _from_env(COMMIT_VARS), _from_env(BRANCH_VARS)
+    try:
+        if commit is None:
+            commit = _git(["rev-parse", "HEAD"], cwd).strip()
+        if branch is None:
+            branch = _git(["rev-parse", "--abbrev-ref", "HEAD"], cwd).strip()
+    except GitError:
+        pass
+    if branch == "HEAD":
+        branch = None
+    return commit, branch
+
+
+def read_summary(path):
+    """(summary, extra top-level keys) of a JSON, Arrow or Parquet report."""
+    with open(path, "rb") as fp:
+        head = fp.read(len(ARROW_MAGIC))
+    if head == ARROW_MAGIC or head.startswith(PARQUET_MAGIC):
+        from .writers import read_columnar
+        doc = read_columnar(path)[1]
+    else:
+        doc = {}
+        with open(path, encoding="utf-8") as fp:
+            # Findings are streamed past; only the small top-level keys are kept.
+            for key, value in iter_report(fp):
+                if key != "finding":
+                    doc[key] = value
+    if "summary" not in doc:
+        raise ValueError(f"{path}: no summary found")
+    return doc.pop("summary"), doc
+
+
+class TrendStore:
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        # WAL lets the dashboard read while CI appends.
+        self.db.execute("PRAGMA journal_mode=WAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, 1, SCHEMA_VERSION):
+            self.db.close()
+            raise ValueError(f"{path}: unsupported trend store version {version}")
+        with self.db:
+            if version == 1:
+                self.db.executescript(MIGRATE_V1)
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def record(self, summary, perf=None, commit=None, branch=None, report=None, recorded_at=None, duration=None):
+        """Append one build and update the rollups; returns the build id."""
+        recorded_at = int(time.time() if recorded_at is None else recorded_at)
+        day = time.strftime("%Y-%m-%d", time.gmtime(recorded_at))
+        if duration is None and perf:
+            duration = perf.get("phases", {}).get("total", {}).get("seconds")
+        score = summary.get("score")
+        total = summary.get("total_findings", 0)
+        counts = dict(summary.get("by_rule", {}))
+        timings = (perf or {}).get("rules", {})
+        for rule in timings:
+            counts.setdefault(rule, 0)
+        with self.db:
+            build_id = self.db.execute(
+                "INSERT INTO builds (recorded_at, day, commit_sha, branch, report, total_findings, score,"
+                " weighted_cost, lines_of_code, duration, perf) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (recorded_at, day, commit, branch, report, total, score, summary.get("weighted_cost"),
+                 summary.get("lines_of_code"), duration, json.dumps(perf) if perf else None)).lastrowid
+            self.db.executemany(
+                "INSERT INTO rule_counts (build_id, rule, count, seconds) VALUES (?, ?, ?, ?)",
+                [(build_id, rule, count, timings.get(rule, {}).get("seconds"))
+                 for rule, count in sorted(counts.items())])
+            self.db.execute(
+                "INSERT INTO daily VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (day) DO UPDATE SET"
+                " builds = builds + 1, findings = findings + excluded.findings,"
+                " score_sum = score_sum + excluded.score_sum, score_builds = score_builds + excluded.score_builds,"
+                " score_min = min(coalesce(score_min, excluded.score_min), coalesce(excluded.score_min, score_min)),"
+                " score_max = max(coalesce(score_max, excluded.score_max), coalesce(excluded.score_max, score_max)),"
+                " duration_sum = duration_sum + excluded.duration_sum,"
+                " duration_builds = duration_builds + excluded.duration_builds",
+                (day, total, score or 0, score is not None, score, score, duration or 0, duration is not None))
+            self.db.executemany(
+                "INSERT INTO daily_rules VALUES (?, ?, ?) ON CONFLICT (day, rule) DO UPDATE SET"
+                " findings = findings + excluded.findings",
+                [(day, rule, count) for rule, count in counts.items()])
+        return build_id
+
+    @staticmethod
+    def _range(column, since, until):
+        where, params = [], []
+        if since is not None:
+            where.append(f"{column} >= ?")
+            params.append(since)
+        if until is not None:
+            where.append(f"{column} < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(where)) if where else "", params
+
+    def builds(self, since=None, until=None):
+        """Builds recorded in [since, until) (unix seconds), oldest first."""
+        where, params = self._range("recorded_at", since, until)
+        rows = self.db.execute(
+            "SELECT id, recorded_at, commit_sha, branch, report, total_findings, score, weighted_cost,"
+            f" lines_of_code, duration FROM builds{where} ORDER BY recorded_at, id", params)
+        return [dict(row) for row in rows]
+
+    def daily(self, since=None, until=None):
+        """Per-day rollups for days in [since, until) ("YYYY-MM-DD")."""
+        where, params = self._range("day", since, until)
+        rows = self.db.execute(
+            "SELECT day, builds, findings, score_sum / nullif(score_builds, 0) AS score, score_min, score_max,"
+            f" duration_sum / nullif(duration_builds, 0) AS duration FROM daily{where} ORDER BY day", params)
+        return [dict(row) for row in rows]
+
+    def daily_rules(self, since=None, until=None):
+        """[{day, rule, builds, findings}] for days in [since, until); builds
+        counts every build of the day, whether or not the rule had findings."""
+        where, params = self._range("r.day", since, until)
+        rows = self.db.execute(
+            "SELECT r.day, r.rule, d.builds, r.findings FROM daily_rules r JOIN daily d ON d.day = r.day"
+            f"{where} ORDER BY r.day, r.rule", params)
+        return [dict(row) for row in rows]
@@ -0,0 +1,177 @@
+import json
+from . import __version__
+
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+class JsonWriter:
+    """The classic {"summary", "findings"} report, written compactly as findings arrive.
+
+    The summary is only known at the end, so it follows the findings array.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.first = True
+        fp.write('{"findings":[')
+
+    def write(self, item):
+        self.fp.write(_dumps(item) if self.first else "," + _dumps(item))
+        self.first = False
+
+    def close(self, summary, **extra):
+        self.fp.write('],"summary":' + _dumps(summary))
+        for key, value in extra.items():
+            self.fp.write(f",{_dumps(key)}:{_dumps(value)}")
+        self.fp.write("}\n")
+
+
+class JsonlWriter:
+    """One finding per line, followed by a final {"summary": ...} line."""
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def write(self, item):
+        self.fp.write(_dumps(item) + "\n")
+
+    def close(self, summary, **extra):
+        self.fp.write(_dumps({"summary": summary, **extra}) + "\n")
+
+
+class SarifWriter:
+    """SARIF 2.1.0 log with a single run; results are streamed.
+
+    `rules` is a sequence of the rule ids the scan ran (default: all).
+    """
+
+    LEVELS = {"HIGH": "error", "MEDIUM": "warning", "LOW": "note"}
+
+    def __init__(self, fp, rules=None):
+        self.fp = fp
+        from .registry import load_rules, select
+        self.first = True
+        driver = {
+            "name": "greenlint",
+            "version": __version__,
+            "rules": [{"id": r.id, "shortDescription": {"text": r.description}}
+                      for r in load_rules(select() if rules is None else rules)],
+        }
+        fp.write('{"version":"2.1.0",'
+                 '"$schema":"https://json.schemastore.org/sarif-2.1.0.json",'
+                 '"runs":[{"tool":{"driver":' + _dumps(driver) + '},"results":[')
+
+    def write(self, item):
+        location = {"artifactLocation": {"uri": item["file"].replace("\\", "/")}}
+        if item.get("line"):
+            location["region"] = {"startLine": item["line"]}
+        result = {
+            "ruleId": item["rule"],
+            "level": self.LEVELS.get(item.get("severity"), "warning"),
+            "message": {"text": item["message"]},
+            "locations": [{"physicalLocation": location}],
+        }
+        self.fp.write(_dumps(result) if self.first else "," + _dumps(result))
+        self.first = False
+
+    def close(self, summary, **extra):
+        self.fp.write('],"properties":' + _dumps({"summary": summary, **extra}) + "}]}\n")
+
+
+WRITERS = {"json": JsonWriter, "jsonl": JsonlWriter, "sarif": SarifWriter}
+
+
+class ColumnarWriter:
+    """Findings as one Arrow table, for the dashboard and dataframe tools.
+
+    Text columns are dictionary-encoded: each distinct file, rule, severity
+    and message is stored once and rows hold small integer codes, which is
+    also how they are collected here. The summary (and any extra keys) is
+    kept as JSON under the "greenlint" key of the schema metadata.
+
+    Needs pyarrow, which is imported on first use. Unlike the text writers,
+    `fp` must be opened in binary mode.
+    """
+
+    binary = True
+    TEXT = ("file", "rule", "severity", "message")
+    NUMERIC = (("line", "int32"), ("depth", "int16"), ("iterations", "int64"), ("weight", "float64"))
+
+    def __init__(self, fp):
+        import pyarrow  # noqa: F401 - fail before any finding is written
+        self.fp = fp
+        self.codes = {name: {} for name in self.TEXT}
+        self.columns = {name: [] for name in self.TEXT}
+        self.columns.update((name, []) for name, _type in self.NUMERIC)
+
+    def write(self, item):
+        columns = self.columns
+        for name in self.TEXT:
+            codes = self.codes[name]
+            value = item.get(name, "")
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            columns[name].append(code)
+        for name, _type in self.NUMERIC:
+            columns[name].append(item.get(name))
+
+    def table(self, summary, **extra):
+        import pyarrow as pa
+        arrays = {}
+        for name in self.TEXT:
+            arrays[name] = pa.DictionaryArray.from_arrays(
+                pa.array(self.columns[name], pa.int32()), pa.array(list(self.codes[name]), pa.string()))
+        for name, type_ in self.NUMERIC:
+            arrays[name] = pa.array(self.columns[name], getattr(pa, type_)())
+        metadata = {"greenlint": _dumps({"summary": summary, **extra})}
+        return pa.table(arrays, metadata=metadata)
+
+
+class ArrowWriter(ColumnarWriter):
+    """Arrow IPC file: memory-mappable, so readers load it without copying."""
+
+    def close(self, summary, **extra):
+        import pyarrow as pa
+        table = self.table(summary, **extra)
+        with pa.ipc.new_file(self.fp, table.schema) as writer:
+            writer.write_table(table, max_chunksize=1 << 16)
+
+
+class ParquetWriter(ColumnarWriter):
+    """Compressed Parquet file; smaller than Arrow IPC, decoded on read."""
+
+    def close(self, summary, **extra):
+        import pyarrow.parquet as pq
+        pq.write_table(self.table(summary, **extra), self.fp, compression="zstd")
+
+
+# Binary formats with optional dependencies, kept apart so WRITERS stays text-only.
+COLUMNAR_WRITERS = {"arrow": ArrowWriter, "parquet": ParquetWriter}
+ARROW_MAGIC = b"ARROW1"
+PARQUET_MAGIC = b"PAR1"
+
+
+def read_columnar(source):
+    """(table, {"summary": ...}) for an Arrow IPC or Parquet report.
+
+    `source` is a path or bytes. Arrow files are memory-mapped (paths) or
+    wrapped (bytes) rather than copied, so the table shares their memory.
+    """
+    import pyarrow as pa
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:len(ARROW_MAGIC)])
+        data = pa.BufferReader(pa.py_buffer(source))
+    else:
+        with open(source, "rb") as fp:
+            head = fp.read(len(ARROW_MAGIC))
+        data = pa.memory_map(str(source))
+    if head == ARROW_MAGIC:
+        table = pa.ipc.open_file(data).read_all()
+    elif head.startswith(PARQUET_MAGIC):
+        import pyarrow.parquet as pq
+        table = pq.read_table(data)
+    else:
+        raise ValueError("not an Arrow IPC or Parquet report")
+    meta = (table.schema.metadata or {}).get(b"greenlint")
+    return table, json.loads(meta) if meta else {}
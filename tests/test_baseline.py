@@ -0,0 +1,56 @@
+import json
+import pytest
+from greenlint.baseline import BaselineError, Fingerprinter, load_baseline, write_baseline
+from greenlint.cli import main
+from greenlint.rules import Finding
+
+SOURCE = """\
+import requests
+
+class Client:
+    def fetch_all(
+        self, urls,
+    ):
+        for u in urls:
+            requests.get(u)
+            requests.get(u)
+"""
+
+def _prints(tmp_path, source, lines):
+    path = tmp_path / "app.py"
+    path.write_text(source, encoding="utf-8")
+    return Fingerprinter(tmp_path)(str(path), [Finding(str(path), n, "PY002") for n in lines])
+
+def test_fingerprints_survive_line_shifts_and_count_duplicates(tmp_path):
+    before = _prints(tmp_path, SOURCE, [8, 9])
+    after = _prints(tmp_path, "# header\n\n" + SOURCE.replace("            requests", "        \trequests"), [10, 11])
+    assert before == after
+    # Identical lines in the same function are told apart by their ordinal.
+    assert len(set(before)) == 2
+    moved = _prints(tmp_path, SOURCE.replace("fetch_all", "fetch_some"), [8])
+    assert moved[0] not in before
+
+def test_baseline_file_round_trip(tmp_path):
+    path = tmp_path / "b.bin"
+    write_baseline(path, [3, 1, 2**64 - 1, 3])
+    assert load_baseline(path) == {1, 3, 2**64 - 1}
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(BaselineError):
+        load_baseline(path)
+
+def test_cli_reports_only_new_findings(tmp_path, capsys):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "app.py").write_text(SOURCE, encoding="utf-8")
+    base = str(tmp_path / "greenlint.baseline")
+    main([str(src), "--no-cache", "-j", "1", "--write-baseline", base])
+
+    (src / "app.py").write_text("import os\n" + SOURCE + "        for p in urls:\n            requests.post(p)\n",
+                                encoding="utf-8")
+    report = tmp_path / "report.json"
+    capsys.readouterr()
+    main([str(src), "--no-cache", "-j", "1", "--baseline", base, "-o", str(report)])
+    assert "Suppressed 2 finding(s)" in capsys.readouterr().out
+    doc = json.loads(report.read_text(encoding="utf-8"))
+    assert [(f["rule"], f["line"]) for f in doc["findings"]] == [("PY002", 12)]
+    assert doc["summary"]["total_findings"] == 1
@@ -0,0 +1,18 @@
+from collections import Counter
+from benchmarks.run import compare
+from benchmarks.synth import generate
+from greenlint.scanner import scan_path
+
+def test_synthetic_tree_matches_manifest(tmp_path):
+    manifest = generate(tmp_path, files=12, depth=4, density={"PD001": 1.5}, artifact_mb=[600, 1])
+    found = Counter(f.rule_id for f in scan_path(tmp_path, jobs=1))
+    assert dict(found) == {k: v for k, v in manifest["expected"].items() if v}
+    assert manifest["expected"]["AI001"] == 1
+
+def test_compare_flags_regressions_in_either_direction():
+    baseline = {"metrics": {"rate": {"value": 100.0, "unit": "files/s", "better": "higher"},
+                            "rss": {"value": 50.0, "unit": "MiB", "better": "lower"}}}
+    ok = {"metrics": {"rate": {"value": 90.0}, "rss": {"value": 55.0}}}
+    bad = {"metrics": {"rate": {"value": 70.0}, "rss": {"value": 70.0}}}
+    assert compare(ok, baseline, 0.2) == []
+    assert [name for name, *_ in compare(bad, baseline, 0.2)] == ["rate", "rss"]
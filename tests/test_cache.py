@@ -0,0 +1,39 @@
+import os
+from greenlint import scanner
+from greenlint.cache import ResultCache
+from greenlint.scanner import scan_path
+
+def test_warm_scan_skips_parsing(tmp_path, monkeypatch):
+    target = tmp_path / "mod.py"
+    target.write_text("items = list(x)\nfor i in items:\n    if i in items:\n        pass\n", encoding="utf-8")
+    cache = ResultCache(tmp_path / "cache")
+    cold = scan_path(target, jobs=1, cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ast.parse called on a cached file")
+    monkeypatch.setattr(scanner.ast, "parse", fail)
+    warm = scan_path(target, jobs=1, cache=cache)
+    assert [(f.lineno, f.rule_id) for f in warm] == [(f.lineno, f.rule_id) for f in cold] == [(3, "PY001")]
+
+def test_key_depends_on_rule_set(tmp_path):
+    cache = ResultCache(tmp_path)
+    assert cache.key(b"x = 1", ["PY001"]) != cache.key(b"x = 1", ["PY001", "PY002"])
+    assert cache.key(b"x = 1", ["PY002", "PY001"]) == cache.key(b"x = 1", ["PY001", "PY002"])
+
+def test_rule_selection_is_part_of_the_key(tmp_path):
+    target = tmp_path / "mod.py"
+    target.write_text("import logging\nfor i in items:\n    if i in list(items):\n        logging.info(f'{i}')\n",
+                      encoding="utf-8")
+    cache = ResultCache(tmp_path / "cache")
+    assert {f.rule_id for f in scan_path(target, jobs=1, cache=cache, rules=("PY001",))} == {"PY001"}
+    assert {f.rule_id for f in scan_path(target, jobs=1, cache=cache)} == {"PY001", "PY003"}
+
+def test_prune_evicts_oldest(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=200)
+    keys = [cache.key(str(i).encode()) for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, [[i, "PY001", "x" * 20]])
+        os.utime(cache._path(key), (i, i))
+    assert cache.prune() > 0
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[-1]) is not None
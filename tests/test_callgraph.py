@@ -0,0 +1,87 @@
+from greenlint.cache import ResultCache
+from greenlint.callgraph import ProjectIndex
+from greenlint.scanner import scan_path
+
+FILES = {
+    "pkg/__init__.py": "from .net import fetch\n",
+    "pkg/net.py": """import requests
+
+def _get(url):
+    return requests.get(url)
+
+def fetch(url):
+    return _get(url)
+
+class Store:
+    def __init__(self, path):
+        self.fp = open(path)
+
+    def load(self, name):
+        return name
+
+    def load_all(self, names):
+        for n in names:
+            self.reload(n)
+
+    def reload(self, name):
+        return Store(name)
+""",
+    "app.py": """import pkg
+from pkg.net import Store
+
+def main(urls, names):
+    for u in urls:
+        pkg.fetch(u)
+        len(u)
+    for n in range(10):
+        Store(n).load(n)
+""",
+}
+
+def _indirect(findings):
+    return sorted((f.file.rsplit("/", 1)[-1], f.lineno, f.rule_id, f.iterations)
+                  for f in findings if "Loop calls" in f.message)
+
+EXPECTED = [("app.py", 6, "PY002", 100), ("app.py", 9, "IO001", 10), ("net.py", 18, "IO001", 100)]
+
+def _project(tmp_path):
+    for name, text in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+def test_loops_reaching_io_through_helpers(tmp_path):
+    _project(tmp_path)
+    assert _indirect(scan_path(tmp_path, jobs=1)) == []
+    findings = scan_path(tmp_path, jobs=1, index=ProjectIndex(tmp_path))
+    assert _indirect(findings) == EXPECTED
+    assert "requests.get" in next(f.message for f in findings if f.rule_id == "PY002")
+
+def test_persisted_index_serves_partial_scans(tmp_path):
+    _project(tmp_path)
+    cache = ResultCache(tmp_path / "cache")
+    index = ProjectIndex(tmp_path, str(tmp_path / "cache" / "index.json"))
+    assert _indirect(scan_path(tmp_path, jobs=1, cache=cache, index=index)) == EXPECTED
+    index.save()
+
+    # Only app.py is rescanned; the helpers come from the saved index.
+    index = ProjectIndex(tmp_path, str(tmp_path / "cache" / "index.json")).load()
+    findings = scan_path(tmp_path, jobs=1, cache=cache, index=index, files=[str(tmp_path / "app.py")])
+    assert _indirect(findings) == EXPECTED[:2]
+
+    # Editing a helper outside the scan is picked up from disk.
+    net = tmp_path / "pkg" / "net.py"
+    net.write_text(net.read_text().replace("requests.get(url)", "url"))
+    index = ProjectIndex(tmp_path, str(tmp_path / "cache" / "index.json")).load()
+    findings = scan_path(tmp_path, jobs=1, cache=cache, index=index, files=[str(tmp_path / "app.py")])
+    assert _indirect(findings) == EXPECTED[1:2]
+
+def test_shards_index_the_whole_tree(tmp_path):
+    _project(tmp_path)
+    # app.py and pkg/net.py land in different shards of two; each shard has
+    # its own in-memory index and still resolves the other's helpers.
+    findings = []
+    for shard in ((1, 2), (2, 2)):
+        findings += scan_path(tmp_path, jobs=1, shard=shard, index=ProjectIndex(tmp_path))
+    assert _indirect(findings) == EXPECTED
+    assert len(findings) == len(scan_path(tmp_path, jobs=1, index=ProjectIndex(tmp_path)))
@@ -0,0 +1,34 @@
+from greenlint.discovery import GitIgnore, iter_files
+from greenlint.scanner import scan_path
+
+def _touch(root, rel, text=""):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+def test_gitignore_rules():
+    ignore = GitIgnore(["*.gen.py", "/top.py", "build/", "docs/**/skip.py", "!keep.gen.py"])
+    assert ignore.match("a/b/x.gen.py", False)
+    assert not ignore.match("a/keep.gen.py", False)
+    assert ignore.match("top.py", False)
+    assert ignore.match("sub/top.py", False) is None
+    assert ignore.match("build", True)
+    assert ignore.match("build", False) is None
+    assert ignore.match("docs/a/b/skip.py", False)
+
+def test_walk_prunes_excludes_and_gitignore(tmp_path):
+    for rel in ("app/main.py", ".venv/lib/site.py", "node_modules/x.py",
+                "app/gen/out.py", "app/vendor/lib.py", "notes.txt"):
+        _touch(tmp_path, rel)
+    _touch(tmp_path, "app/.gitignore", "gen/\n")
+    found = [rel for _path, rel, _size in iter_files(tmp_path, (".venv", "node_modules", "vendor"))]
+    assert found == ["app/main.py"]
+
+def test_model_artifacts_reach_ai001_without_reads(tmp_path):
+    model = tmp_path / "model.onnx"
+    with open(model, "wb") as fp:
+        fp.truncate(600 * 1024 * 1024)
+    (tmp_path / "small.pt").write_bytes(b"x")
+    findings = scan_path(tmp_path, jobs=1)
+    assert [(f.rule_id, f.file) for f in findings] == [("AI001", str(model))]
@@ -0,0 +1,65 @@
+from greenlint.cli import main
+from greenlint.fix import fix_source
+
+SOURCE = '''import logging
+items = list(range(1000))
+
+def f(df, xs):
+    for x in xs:
+        logging.info(f"x={x!r} ({x:.1f}%)")
+        if x in items or x not in items:
+            pass
+    for x in xs:
+        if x not in items:
+            items.append(x)
+    df["c"] = df.apply(lambda r: (r["a"] + 1) * r['b'], axis=1)
+'''
+
+FIXED = '''import logging
+items = list(range(1000))
+
+def f(df, xs):
+    items_set = set(items)
+    for x in xs:
+        logging.info("x=%r (%.1f%%)", x, x)
+        if x in items_set or x not in items_set:
+            pass
+    for x in xs:
+        if x not in items:
+            items.append(x)
+    df["c"] = ((df["a"] + 1) * df['b'])
+'''
+
+def test_fix_source_applies_all_fixes_in_one_pass():
+    new, applied = fix_source(SOURCE)
+    assert new == FIXED
+    # The second loop grows the list, so it is left alone.
+    assert sorted(applied) == ["PD001", "PY001", "PY001", "PY003"]
+    assert fix_source(FIXED) == (FIXED, [])
+
+def test_cli_diff_and_fix(tmp_path, capsys):
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    main([str(path), "--no-cache", "-j", "1", "--diff"])
+    diff = capsys.readouterr().out
+    assert diff.startswith("--- ") and '+    items_set = set(items)\n' in diff
+    assert path.read_text(encoding="utf-8") == SOURCE
+    main([str(path), "--no-cache", "-j", "1", "--fix"])
+    assert path.read_text(encoding="utf-8") == FIXED
+    assert "Applied 4 fix(es) in 1 file(s)" in capsys.readouterr().out
+
+def test_hoist_needs_hashable_elements():
+    loop = "for x in xs:\n    if x in {name}:\n        pass\n"
+    for binding in ("pairs = [[1, 2], [3, 4]]", "pairs = list(rows)", "pairs = [a, b] * 10"):
+        source = binding + "\n" + loop.format(name="pairs")
+        assert fix_source(source) == (source, [])
+    source = "names = 'a b c'.split()\n" + loop.format(name="names")
+    assert fix_source(source)[0].startswith("names = 'a b c'.split()\nnames_set = set(names)\n")
+
+def test_lazy_logging_keeps_percent_without_arguments():
+    new, applied = fix_source('import logging\nlogging.info(f"100% done")\n')
+    assert new == 'import logging\nlogging.info("100% done")\n' and applied == ["PY003"]
+
+def test_vectorise_needs_a_column():
+    source = "df['c'] = df.apply(lambda r: 1 + 2, axis=1)\n"
+    assert fix_source(source) == (source, [])
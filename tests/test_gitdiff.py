@@ -0,0 +1,54 @@
+import os
+import shutil
+import subprocess
+import pytest
+from greenlint.cli import main
+from greenlint.gitdiff import changed_files, on_changed_line
+from greenlint.rules import Finding
+from greenlint.scanner import scan_path
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+LOOP = "for i in items:\n    if i in list(items):\n        pass\n"
+
+def _git(root, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                   cwd=root, check=True, capture_output=True)
+
+def test_since_scans_changed_files_and_lines(tmp_path):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "old.py").write_text(LOOP, encoding="utf-8")
+    (tmp_path / "same.py").write_text(LOOP, encoding="utf-8")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    (tmp_path / "old.py").write_text(LOOP + "for j in items:\n    if j in list(items):\n        pass\n", encoding="utf-8")
+    (tmp_path / "new.py").write_text(LOOP, encoding="utf-8")
+
+    changed = changed_files(str(tmp_path), since="HEAD")
+    findings = scan_path(tmp_path, jobs=1, files=list(changed))
+    assert sorted((f.file.rpartition("/")[2], f.lineno) for f in findings) == [
+        ("new.py", 2), ("old.py", 2), ("old.py", 5)]
+    kept = [f for f in findings if on_changed_line(f, changed)]
+    assert sorted((f.file.rpartition("/")[2], f.lineno) for f in kept) == [("new.py", 2), ("old.py", 5)]
+
+def test_findings_outside_changed_files_are_dropped(tmp_path):
+    root = os.path.realpath(tmp_path)
+    changed = {os.path.join(root, "whole.py"): None, os.path.join(root, "part.py"): [(3, 4)]}
+    assert on_changed_line(Finding(os.path.join(root, "whole.py"), 9, "PY001"), changed)
+    assert on_changed_line(Finding(os.path.join(root, "part.py"), 4, "PY001"), changed)
+    assert not on_changed_line(Finding(os.path.join(root, "part.py"), 5, "PY001"), changed)
+    assert not on_changed_line(Finding(os.path.join(root, "other.py"), 1, "PY001"), changed)
+
+def test_changed_lines_refuses_partly_staged_files(tmp_path, capsys):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "a.py").write_text(LOOP, encoding="utf-8")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    (tmp_path / "a.py").write_text(LOOP * 2, encoding="utf-8")
+    _git(tmp_path, "add", ".")
+    main([str(tmp_path), "--no-cache", "-j", "1", "--staged", "--changed-lines"])
+    assert "PY001: 1" in capsys.readouterr().out
+    (tmp_path / "a.py").write_text("\n" + LOOP * 2, encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--no-cache", "-j", "1", "--staged", "--changed-lines"])
+    assert "a.py" in capsys.readouterr().err
@@ -0,0 +1,47 @@
+import json
+from greenlint.cli import main
+from greenlint.hotspots import enclosing, function_spans, rank, run_script
+from greenlint.scanner import scan_path
+
+APP = '''import functools
+
+def cold(xs: list):
+    for x in xs:
+        if x in xs:
+            pass
+
+@functools.lru_cache(None)
+def hot(n):
+    total = 0
+    for i in range(n):
+        if i in list(range(4)):
+            total += i
+    return total
+
+if __name__ == "__main__":
+    for n in range(200, 220):
+        hot(n)
+'''
+
+def test_enclosing_uses_decorator_line(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(APP)
+    spans = function_spans(path)
+    assert enclosing(spans, 12) == (8, "hot")
+    assert enclosing(spans, 5) == (3, "cold")
+    assert enclosing(spans, 18) == (1, "<module>")
+
+def test_rank_by_measured_cost(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(APP)
+    stats = run_script(str(path), save=str(tmp_path / "app.prof"))
+    ranked = rank(scan_path(tmp_path, jobs=1), stats)
+    assert [(f["line"], f["function"]) for f in ranked] == [(12, "hot"), (5, "cold")]
+    assert ranked[0]["calls"] == 20 and ranked[0]["cumtime"] > 0
+    assert ranked[1]["calls"] == 0 and ranked[1]["cumtime"] == 0
+
+    report = tmp_path / "report.json"
+    main(["profile", str(tmp_path), "--pstats", str(tmp_path / "app.prof"), "-o", str(report), "-j", "1"])
+    doc = json.loads(report.read_text())
+    assert [f["function"] for f in doc["findings"]] == ["hot", "cold"]
+    assert doc["profile"]["total_time"] > 0
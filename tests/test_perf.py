@@ -0,0 +1,32 @@
+from greenlint import perf
+from greenlint.perf import Profiler, format_table
+from greenlint.scanner import scan_path
+
+def test_profiler_records_phases_rules_and_hooks():
+    seen = []
+    perf.add_hook(seen.append)
+    try:
+        profiler = Profiler(top=1)
+        findings = scan_path("examples", jobs=1, profiler=profiler)
+        stats = profiler.finish()
+    finally:
+        perf.remove_hook(seen.append)
+    assert seen == [stats]
+    assert len(findings) == 3
+    assert stats["phases"]["parse"]["calls"] == 1
+    assert stats["phases"]["discover"]["calls"] == 1
+    assert stats["rules"]["PY001"]["calls"] == 1
+    assert [f["file"] for f in stats["slowest_files"]] == ["examples/bad_patterns.py"]
+    assert "PY003" in format_table(stats)
+
+def test_merge_worker_stats():
+    a, b = Profiler(top=2), Profiler(top=2)
+    a.add_phase("parse", 1.0)
+    a.add_file("a.py", 1.0)
+    b.add_phase("parse", 2.0, 3)
+    b.add_file("b.py", 3.0)
+    b.add_file("c.py", 0.5)
+    a.merge(b.as_dict())
+    stats = a.as_dict()
+    assert stats["phases"]["parse"] == {"seconds": 3.0, "calls": 4}
+    assert [f["file"] for f in stats["slowest_files"]] == ["b.py", "a.py"]
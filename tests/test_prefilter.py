@@ -0,0 +1,38 @@
+from benchmarks.synth import generate
+from greenlint import scanner
+from greenlint.prefilter import Prefilter
+from greenlint.rules import ALL_RULES
+from greenlint.scanner import scan_path
+
+TRICKY = {
+    "upper.py": "model.FIT(x)\nnet.Train()\n",
+    "spaced.py": "for u in urls:\n    requests . get(u)\n",
+    "continued.py": "for p in paths:\n    x = pd.\\\n        read_csv(p)\n",
+    "unicode.py": "# café\nfor x in xs:\n    if x in list(ys):\n        pass\n",
+    "iter.py": "for _, row in df.iterrows():\n    pass\n",
+    "logs.py": "import logging as logging\nlogging.info('{}'.format(x))\n",
+    "clean.py": "def add(a, b):\n    return a + b\n",
+}
+
+def _rows(findings):
+    return [(f.file, f.lineno, f.rule_id, f.message) for f in findings]
+
+def test_prefilter_never_drops_findings(tmp_path):
+    for name, text in TRICKY.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    generate(tmp_path / "synth", files=40, depth=3)
+    for root in (tmp_path, "examples", "greenlint"):
+        full = scan_path(root, jobs=1, prefilter=False)
+        assert _rows(scan_path(root, jobs=1)) == _rows(full)
+    assert {f.rule_id for f in scan_path(tmp_path, jobs=1, prefilter=False)} >= {
+        "PY001", "PY002", "PY003", "AI002", "PD001", "IO001"}
+
+def test_file_without_triggers_is_not_parsed(tmp_path, monkeypatch):
+    path = tmp_path / "clean.py"
+    path.write_text(TRICKY["clean.py"], encoding="utf-8")
+    assert Prefilter(ALL_RULES).select(path.read_bytes()) == ()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed a file no rule can match")
+    monkeypatch.setattr(scanner.ast, "parse", fail)
+    assert scan_path(path, jobs=1) == []
@@ -0,0 +1,102 @@
+import io
+import json
+import sys
+import pytest
+from greenlint import registry, rules
+from greenlint.cli import main
+from greenlint.scanner import scan_path
+from greenlint.server import Workspace
+from greenlint.writers import SarifWriter
+
+PACK = '''
+import ast
+from greenlint.rules import Finding, RuleBase
+
+class SleepInLoop(RuleBase):
+    id = "CT001"
+    description = "time.sleep inside a loop"
+    message = "Sleeping inside a loop."
+    node_types = (ast.Call,)
+    in_loop = True
+    triggers = (b"sleep",)
+
+    def visit(self, node, ctx):
+        if getattr(node.func, "attr", None) == "sleep":
+            self.report(ctx, node)
+
+class SleepImported(RuleBase):
+    # Written against the older whole-tree check() API: no node_types.
+    id = "LG001"
+    message = "Imports time."
+
+    def check(self, file_path, tree):
+        return [Finding(file_path, node.lineno, self.id) for node in ast.walk(tree)
+                if isinstance(node, ast.Import) and node.names[0].name == "time"]
+'''
+
+@pytest.fixture
+def pack(tmp_path, monkeypatch):
+    site = tmp_path / "site"
+    (site / "greenlint_carbon-1.2.dist-info").mkdir(parents=True)
+    (site / "greenlint_carbon-1.2.dist-info" / "entry_points.txt").write_text(
+        "[console_scripts]\ncarbon = carbon_pack:main\n\n[greenlint.rules]\nCT001 = carbon_pack:SleepInLoop\n"
+        "LG001 = carbon_pack:SleepImported\n")
+    (site / "carbon_pack.py").write_text(PACK)
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.setattr(registry, "_available", None)
+    monkeypatch.setattr(rules, "RULES_BY_ID", dict(rules.RULES_BY_ID))
+    monkeypatch.delitem(sys.modules, "carbon_pack", raising=False)
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "app.py").write_text("import time\nfor x in xs:\n    time.sleep(1)\n    if x in list(ys):\n        pass\n")
+    return src
+
+def test_select_and_ignore_by_prefix(pack):
+    assert set(registry.BUILTIN) == {r.id for r in rules.ALL_RULES}
+    assert registry.available()["CT001"] == ("carbon_pack:SleepInLoop", "1.2")
+    assert registry.select(["PY"]) == ("PY001", "PY002", "PY003")
+    assert registry.select(["PY,CT"], ["PY002", "PY003"]) == ("CT001", "PY001")
+    assert "CT001" in registry.select() and "AI001" not in registry.select(ignore=["AI"])
+    with pytest.raises(KeyError):
+        registry.select(["XX"])
+    # Listing and selecting never imports a pack.
+    assert "carbon_pack" not in sys.modules
+    assert registry.salt(["PY001", "CT001"]) == ["PY001", "CT001=carbon_pack:SleepInLoop@1.2"]
+
+def test_pack_rules_load_on_demand(pack):
+    found = scan_path(pack, jobs=1, rules=("PY001",))
+    assert [f.rule_id for f in found] == ["PY001"] and "carbon_pack" not in sys.modules
+    found = {f.rule_id: f for f in scan_path(pack, jobs=1)}
+    assert found["CT001"].message == "Sleeping inside a loop." and found["CT001"].lineno == 3
+
+def test_workers_load_pack_rules(pack, monkeypatch):
+    for i in range(80):
+        (pack / f"m{i}.py").write_text("import time\nfor x in xs:\n    time.sleep(x)\n")
+    found = scan_path(pack, jobs=2, rules=("CT001",))
+    assert len(found) == 81 and {f.rule_id for f in found} == {"CT001"}
+
+def test_cli_select_ignore_and_version(pack, capsys):
+    main([str(pack), "--no-cache", "-j", "1", "--select", "CT,PY", "--ignore", "PY001"])
+    out = capsys.readouterr().out
+    assert "CT001: 1" in out and "PY001" not in out
+    with pytest.raises(SystemExit):
+        main([str(pack), "--select", "XX"])
+    with pytest.raises(SystemExit):
+        main(["--version"])
+    assert capsys.readouterr().out.startswith("greenlint ")
+
+def test_check_only_pack_rules_run(pack):
+    found = scan_path(pack, jobs=1, rules=("LG001",))
+    assert [(f.rule_id, f.lineno, f.message) for f in found] == [("LG001", 1, "Imports time.")]
+
+def test_server_and_sarif_use_the_registry(pack, tmp_path):
+    ws = Workspace()
+    assert {f.rule_id for f in ws.check(str(pack / "app.py"))} == {"CT001", "LG001", "PY001"}
+    assert {f.rule_id for f in Workspace(rules=("CT001",)).check(str(pack / "app.py"))} == {"CT001"}
+    out = tmp_path / "report.sarif"
+    main([str(pack), "--no-cache", "-j", "1", "--select", "CT,PY001", "--format", "sarif", "-o", str(out)])
+    driver = json.loads(out.read_text())["runs"][0]["tool"]["driver"]
+    assert [r["id"] for r in driver["rules"]] == ["CT001", "PY001"]
+    out = io.StringIO()
+    SarifWriter(out).close({})
+    assert "CT001" in [r["id"] for r in json.loads(out.getvalue())["runs"][0]["tool"]["driver"]["rules"]]
@@ -0,0 +1,90 @@
+import io
+import json
+import pytest
+from greenlint.cli import main
+from greenlint.report import _Reader, iter_report, load_frame, merge_reports
+from greenlint.writers import COLUMNAR_WRITERS, WRITERS, JsonWriter, read_columnar
+
+def test_iter_report_streams_across_chunk_boundaries(monkeypatch):
+    doc = {"summary": {"total_findings": 2}, "findings": [{"line": 123456789, "rule": "PY001"}] * 40}
+    text = json.dumps(doc, indent=2)
+    monkeypatch.setattr(_Reader.__init__, "__defaults__", (7,))
+    events = list(iter_report(io.StringIO(text)))
+    assert events[0] == ("summary", {"total_findings": 2})
+    assert events[1:] == [("finding", {"line": 123456789, "rule": "PY001"})] * 40
+
+def test_merge_recomputes_summary(tmp_path):
+    a = {"summary": {"total_findings": 1, "score": 98, "lines_of_code": 1500},
+         "findings": [{"file": "a.py", "line": 1, "rule": "PY001", "message": "m", "severity": "MEDIUM",
+                       "weight": 6.0}]}
+    b = {"summary": {"total_findings": 2, "score": 96, "lines_of_code": 500},
+         "findings": [{"file": "b.py", "line": 2, "rule": "PY002", "message": "m", "severity": "HIGH",
+                       "weight": 24.0},
+                      {"file": "b.py", "line": 3, "rule": "PY001", "message": "m", "severity": "MEDIUM"}]}
+    paths = []
+    for name, doc in (("a.json", a), ("b.json", b)):
+        (tmp_path / name).write_text(json.dumps(doc), encoding="utf-8")
+        paths.append(tmp_path / name)
+    out = io.StringIO()
+    summary = merge_reports(paths, JsonWriter(out))
+    merged = json.loads(out.getvalue())
+    assert merged["summary"] == summary
+    # 32 weighted cost over 2000 lines: 16 per KLOC -> 100 / (1 + 16 / 20)
+    assert summary == {"total_findings": 3, "score": 56, "weighted_cost": 32.0, "lines_of_code": 2000,
+                       "by_rule": {"PY001": 2, "PY002": 1}, "by_severity": {"MEDIUM": 2, "HIGH": 1}}
+    assert [f["file"] for f in merged["findings"]] == ["a.py", "b.py", "b.py"]
+
+def test_writers_stream_findings_and_summary():
+    item = {"file": "a.py", "line": 3, "rule": "PY001", "message": "m", "severity": "MEDIUM"}
+    summary = {"total_findings": 2, "score": 96, "by_rule": {"PY001": 2}, "by_severity": {"MEDIUM": 2}}
+    docs = {}
+    for name, cls in WRITERS.items():
+        out = io.StringIO()
+        writer = cls(out)
+        writer.write(item)
+        writer.write(item)
+        writer.close(summary)
+        docs[name] = out.getvalue()
+
+    report = json.loads(docs["json"])
+    assert report == {"findings": [item, item], "summary": summary}
+    assert [f for k, f in iter_report(io.StringIO(docs["json"])) if k == "finding"] == [item, item]
+    lines = [json.loads(line) for line in docs["jsonl"].splitlines()]
+    assert lines == [item, item, {"summary": summary}]
+    run = json.loads(docs["sarif"])["runs"][0]
+    assert run["results"][0]["locations"][0]["physicalLocation"]["region"] == {"startLine": 3}
+    assert run["properties"]["summary"] == summary
+
+def test_columnar_writers_round_trip(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    items = [{"file": "a.py", "line": i, "rule": "PY001", "message": "m", "severity": "MEDIUM",
+              "depth": 1, "iterations": 100, "weight": 6.0} for i in range(1, 4)]
+    summary = {"total_findings": 3, "score": 90}
+    for name, cls in COLUMNAR_WRITERS.items():
+        path = tmp_path / f"report.{name}"
+        with open(path, "wb") as fp:
+            writer = cls(fp)
+            for item in items:
+                writer.write(item)
+            writer.close(summary)
+        for source in (path, path.read_bytes()):
+            table, meta = read_columnar(source)
+            assert meta == {"summary": summary}
+            assert pa.types.is_dictionary(table.schema.field("rule").type)
+            assert table.to_pylist() == items
+
+def test_load_frame_reads_every_report_format(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    frames = {}
+    for fmt in ("json", "arrow", "parquet"):
+        path = tmp_path / f"report.{fmt}"
+        main(["examples", "--no-cache", "-j", "1", "--format", fmt, "-o", str(path)])
+        frame, row = load_frame(path.read_bytes(), fmt)
+        assert row["total_findings"] == len(frame) > 0
+        frames[fmt] = frame
+    cols = ["file", "line", "rule", "message", "severity", "weight"]
+    expected = frames["json"][cols].to_dict("records")
+    for fmt in ("arrow", "parquet"):
+        assert isinstance(frames[fmt]["rule"].dtype, pd.CategoricalDtype)
+        assert frames[fmt][cols].astype({c: object for c in cols}).to_dict("records") == expected
@@ -1,6 +1,106 @@
-
+import ast
+from greenlint.engine import Dispatcher
+from greenlint.rules import ALL_RULES, Finding, InefficientMembershipCheck, PandasRowWiseOps
 from greenlint.scanner import scan_path
 
 def test_scan_examples():
     findings = scan_path('examples/bad_patterns.py')
     assert len(findings) >= 1
+
+NESTED = """
+for a in xs:
+    for b in ys:
+        for c in zs:
+            if c in sorted(ys):
+                open(c)
+"""
+
+def test_nested_loops_report_once():
+    findings = Dispatcher(ALL_RULES).run("nested.py", ast.parse(NESTED))
+    assert sorted((f.rule_id, f.lineno) for f in findings) == [("IO001", 6), ("PY001", 5)]
+
+def test_check_shim_matches_dispatcher():
+    tree = ast.parse(NESTED)
+    findings = InefficientMembershipCheck().check("nested.py", tree)
+    assert [(f.rule_id, f.lineno) for f in findings] == [("PY001", 5)]
+
+def test_finding_is_compact_and_uses_rule_table():
+    f = Finding("a.py", 3, "PY001", InefficientMembershipCheck.message, "MEDIUM")
+    assert not hasattr(f, "__dict__")
+    assert f._message is None and f._severity is None
+    assert f.to_dict() == {"file": "a.py", "line": 3, "rule": "PY001",
+                           "message": InefficientMembershipCheck.message, "severity": "MEDIUM",
+                           "depth": 0, "iterations": 1, "weight": 2.0}
+    g = Finding("a.py", 4, "PD001", PandasRowWiseOps.iterrows_message)
+    assert g.message == PandasRowWiseOps.iterrows_message
+
+COSTS = """
+import requests
+logging.debug(f"{x}")
+for a in xs:
+    for b in range(10):
+        if b in list(ys):
+            pass
+for i in range(5):
+    requests.get(i)
+"""
+
+def test_findings_weighted_by_loop_cost():
+    findings = {f.rule_id: f for f in Dispatcher(ALL_RULES).run("costs.py", ast.parse(COSTS))}
+    assert (findings["PY003"].depth, findings["PY003"].iterations) == (0, 1)
+    assert (findings["PY001"].depth, findings["PY001"].iterations) == (2, 1000)
+    assert (findings["PY002"].depth, findings["PY002"].iterations) == (1, 5)
+    assert findings["PY003"].severity == "MEDIUM" and findings["PY003"].weight == 2
+    # Unknown outer loop counts as 100 iterations: 2 * (1 + log10(100 * 10)).
+    assert findings["PY001"].weight == 8 and findings["PY001"].severity == "MEDIUM"
+    # Network bound: 2 * 4 * (1 + log10(5)).
+    assert findings["PY002"].severity == "HIGH"
+
+MEMBERSHIP = """
+ids = [r.id for r in rows]
+lookup = set(ids)
+mapping = dict(pairs)
+
+def f(names: list, tags, *args):
+    seen = []
+    for x in xs:
+        if x in ids: pass            # 9: list comprehension, invariant
+        if x in lookup: pass
+        if x in mapping: pass
+        if x in "abc": pass
+        if x in (1, 2): pass
+        if x not in seen:            # 14: list grown in the loop
+            seen.append(x)
+        if x in names: pass          # 16: annotated list parameter
+        if x in tags: pass
+        if x in args: pass           # 18: *args tuple
+        if x in mapping.values(): pass   # 19
+        chunk = x.split()
+        if "a" in chunk: pass        # rebound every iteration
+        for y in ys:
+            if y in chunk: pass      # 23: invariant in the inner loop
+"""
+
+def test_membership_only_on_linear_containers():
+    findings = Dispatcher(ALL_RULES).run("m.py", ast.parse(MEMBERSHIP))
+    assert sorted(f.lineno for f in findings if f.rule_id == "PY001") == [9, 14, 16, 18, 19, 23]
+
+SHORT = """
+PAIR = ("a", "b")
+short = ["a", "b", "c"]
+grown = ["a"]
+long = list("abcdefghij")
+
+def add(x):
+    grown.append(x)
+
+for x in xs:
+    if x in ("a", "b") or x in PAIR or x in short: pass
+    if x in grown: pass          # 12: appended to elsewhere
+    if x in long: pass           # 13
+    if x in list("abcdefghij"): pass  # 14
+"""
+
+def test_short_displays_are_exempt_inline_or_named():
+    findings = Dispatcher(ALL_RULES).run("m.py", ast.parse(SHORT))
+    assert sorted(f.lineno for f in findings if f.rule_id == "PY001") == [12, 13, 14]
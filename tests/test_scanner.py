@@ -0,0 +1,29 @@
+from pathlib import Path
+from greenlint.scanner import CHUNK_SIZE, scan_path
+
+SOURCE = Path("examples/bad_patterns.py").read_text(encoding="utf-8")
+
+def _tree(tmp_path, n):
+    for i in range(n):
+        sub = tmp_path / f"pkg{i % 3}"
+        sub.mkdir(exist_ok=True)
+        (sub / f"mod{i}.py").write_text(SOURCE, encoding="utf-8")
+    return tmp_path
+
+def _rows(findings):
+    return [(f.file, f.lineno, f.rule_id, f.message) for f in findings]
+
+def test_parallel_scan_matches_serial(tmp_path):
+    root = _tree(tmp_path, CHUNK_SIZE * 2 + 5)
+    serial = scan_path(root, jobs=1)
+    parallel = scan_path(root, jobs=2)
+    assert _rows(parallel) == _rows(serial)
+    assert len(serial) == 3 * (CHUNK_SIZE * 2 + 5)
+
+def test_shards_partition_the_tree(tmp_path):
+    root = _tree(tmp_path, 30)
+    whole = _rows(scan_path(root, jobs=1))
+    parts = []
+    for i in range(1, 4):
+        parts.extend(_rows(scan_path(root, jobs=1, shard=(i, 3))))
+    assert sorted(parts) == sorted(whole)
@@ -0,0 +1,94 @@
+import errno
+import io
+import json
+import socket
+import sys
+import threading
+import time
+import pytest
+from greenlint import server
+from greenlint.server import Workspace, serve_stdio, watch
+
+LOOP = "for i in items:\n    if i in list(items):\n        pass\n"
+
+def test_workspace_reparses_only_changed_files(tmp_path, monkeypatch):
+    path = tmp_path / "a.py"
+    path.write_text(LOOP, encoding="utf-8")
+    ws = Workspace()
+    parses = []
+    real_parse = server.ast.parse
+    monkeypatch.setattr(server.ast, "parse", lambda src: parses.append(1) or real_parse(src))
+    assert [f.lineno for f in ws.check(str(path))] == [2]
+    assert [f.lineno for f in ws.check(str(path))] == [2]
+    path.write_text("\n" + LOOP, encoding="utf-8")
+    assert [f.lineno for f in ws.check(str(path))] == [3]
+    assert len(parses) == 2
+    # Only findings are kept, not the trees they came from.
+    assert not any(isinstance(value, server.ast.AST) for value in ws.entries[str(path)])
+
+def test_stdio_protocol(tmp_path):
+    (tmp_path / "a.py").write_text(LOOP, encoding="utf-8")
+    requests = [{"op": "check", "path": str(tmp_path), "id": 1}, {"op": "nope", "id": 2}]
+    out = io.StringIO()
+    serve_stdio(Workspace(), io.StringIO("".join(json.dumps(r) + "\n" for r in requests)), out)
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert first["id"] == 1 and first["summary"]["total_findings"] == 1
+    assert second == {"error": "unknown op: 'nope'", "id": 2}
+
+def test_polling_watch_reports_changes(tmp_path):
+    stop = threading.Event()
+    seen = []
+
+    def on_change(findings, removed):
+        seen.append(({p.rpartition("/")[2]: len(f) for p, f in findings.items()}, removed))
+        stop.set()
+
+    thread = threading.Thread(target=watch, args=(Workspace(), str(tmp_path), on_change),
+                              kwargs={"interval": 0.05, "use_inotify": False, "stop": stop})
+    thread.start()
+    try:
+        time.sleep(0.2)  # let the watcher take its initial snapshot
+        (tmp_path / "new.py").write_text(LOOP, encoding="utf-8")
+        thread.join(5)
+    finally:
+        stop.set()
+        thread.join()
+    assert seen == [({"new.py": 1}, [])]
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watch_sees_files_in_empty_directories(tmp_path):
+    (tmp_path / "a.py").write_text(LOOP, encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    stop = threading.Event()
+    seen = []
+
+    def on_change(findings, removed):
+        seen.append(({p.rpartition("/")[2]: len(f) for p, f in findings.items()}, removed))
+        stop.set()
+
+    thread = threading.Thread(target=watch, args=(Workspace(), str(tmp_path), on_change),
+                              kwargs={"interval": 0.05, "stop": stop})
+    thread.start()
+    try:
+        time.sleep(0.2)  # let the watcher add its watches
+        (tmp_path / "sub" / "new.py").write_text(LOOP, encoding="utf-8")
+        thread.join(5)
+    finally:
+        stop.set()
+        thread.join()
+    assert seen == [({"new.py": 1}, [])]
+
+def test_serve_unix_keeps_a_live_socket(tmp_path, monkeypatch):
+    path = str(tmp_path / "d.sock")
+    # Something is listening (but never answers): refuse to take it over.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+        live.bind(path)
+        live.listen(1)
+        with pytest.raises(OSError) as e:
+            server.serve_unix(Workspace(), path)
+        assert e.value.errno == errno.EADDRINUSE
+    # The listener is gone but its socket file is left behind: replace it.
+    served = []
+    monkeypatch.setattr(server._UnixServer, "serve_forever", lambda self: served.append(self.server_address))
+    server.serve_unix(Workspace(), path)
+    assert served == [path]
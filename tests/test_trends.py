@@ -0,0 +1,59 @@
+from greenlint.cli import main
+from greenlint.trends import TrendStore, build_commit, read_summary
+from greenlint.writers import JsonWriter
+
+DAY = 86400
+
+def _summary(score, by_rule):
+    return {"total_findings": sum(by_rule.values()), "score": score, "weighted_cost": 1.0,
+            "lines_of_code": 100, "by_rule": by_rule, "by_severity": {}}
+
+def test_record_updates_builds_and_daily_rollups(tmp_path):
+    perf = {"phases": {"total": {"seconds": 2.0, "calls": 1}}, "rules": {"PY001": {"seconds": 0.5, "calls": 3}}}
+    with TrendStore(str(tmp_path / "t.db")) as store:
+        store.record(_summary(80, {"PY001": 2}), perf=perf, commit="a", recorded_at=10)
+        store.record(_summary(None, {"PY002": 1}), commit="b", recorded_at=20, duration=4.0)
+        store.record(_summary(60, {"PY001": 1}), commit="c", recorded_at=DAY + 5)
+
+        assert [b["commit_sha"] for b in store.builds(since=15)] == ["b", "c"]
+        assert [b["duration"] for b in store.builds(until=DAY)] == [2.0, 4.0]
+        first, second = store.daily()
+        assert (first["day"], first["builds"], first["findings"]) == ("1970-01-01", 2, 3)
+        # Builds without a score or duration do not drag the averages down.
+        assert (first["score"], first["score_min"], first["score_max"], first["duration"]) == (80, 80, 80, 3.0)
+        assert (second["score"], second["duration"]) == (60, None)
+        assert store.daily_rules(since="1970-01-02") == [
+            {"day": "1970-01-02", "rule": "PY001", "builds": 1, "findings": 1}]
+        seconds = store.db.execute("SELECT seconds FROM rule_counts WHERE build_id = 1").fetchone()[0]
+        assert seconds == 0.5
+
+def test_rule_means_count_clean_builds(tmp_path):
+    path = str(tmp_path / "t.db")
+    with TrendStore(path) as store:
+        for i in range(9):
+            store.record(_summary(100, {}), recorded_at=i)
+        store.record(_summary(90, {"PY001": 10}), recorded_at=9)
+        assert store.daily_rules() == [{"day": "1970-01-01", "rule": "PY001", "builds": 10, "findings": 10}]
+        # A version 1 store, which counted builds per rule, is rebuilt on open.
+        store.db.executescript("DROP TABLE daily_rules; CREATE TABLE daily_rules (day TEXT, rule TEXT,"
+                               " builds INTEGER, findings INTEGER); PRAGMA user_version=1;")
+    with TrendStore(path) as store:
+        assert store.daily_rules() == [{"day": "1970-01-01", "rule": "PY001", "builds": 10, "findings": 10}]
+
+def test_record_command_reads_summary_after_findings(tmp_path, monkeypatch, capsys):
+    report = tmp_path / "report.json"
+    with open(report, "w", encoding="utf-8") as fp:
+        writer = JsonWriter(fp)
+        writer.write({"file": "a.py", "line": 1, "rule": "PY001", "message": "m", "severity": "LOW"})
+        writer.close(_summary(90, {"PY001": 1}), perf={"phases": {"total": {"seconds": 1.5, "calls": 1}}})
+    assert read_summary(report)[0]["score"] == 90
+
+    monkeypatch.setenv("GITHUB_SHA", "deadbeef")
+    monkeypatch.setenv("GITHUB_REF_NAME", "main")
+    assert build_commit(str(tmp_path)) == ("deadbeef", "main")
+    db = str(tmp_path / "t.db")
+    main(["record", str(report), "--db", db])
+    assert "Recorded build 1" in capsys.readouterr().out
+    with TrendStore(db) as store:
+        (build,) = store.builds()
+    assert (build["commit_sha"], build["branch"], build["score"], build["duration"]) == ("deadbeef", "main", 90, 1.5)